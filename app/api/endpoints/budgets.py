@@ -0,0 +1,94 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Path, Body, Request, status
+from fastapi.responses import StreamingResponse
+from app.api.streaming import event_stream, format_event, resume_position
+from app.database import database
+from app.models import Budget, BudgetAlert, BudgetAlertFeed, BudgetCreate, BudgetStatus, ExpenseCategory
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[Budget])
+async def get_budgets():
+    """Get all category budgets."""
+    return database.get_all_budgets()
+
+
+@router.get("/status", response_model=List[BudgetStatus])
+async def get_budget_status(
+    month: Optional[str] = Query(None, description="Month (YYYY-MM), default current month")
+):
+    """Get spend against every budget for a month."""
+    if month:
+        try:
+            year, month_number = (int(part) for part in month.split("-"))
+            date(year, month_number, 1)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid month format: {month}. Expected format: YYYY-MM")
+    else:
+        today = date.today()
+        year, month_number = today.year, today.month
+    return database.get_budget_status(year, month_number)
+
+
+@router.get("/alerts", response_model=BudgetAlertFeed)
+async def get_budget_alerts(
+    since: int = Query(0, ge=0, description="Return alerts with a sequence number greater than this"),
+    epoch: Optional[str] = Query(None, description="Epoch the client's `since` belongs to")
+):
+    """Get budget threshold crossings raised by expense and budget writes.
+
+    `reset` is set when the client's position can no longer be resumed, either
+    because the server restarted (new epoch) or because the requested alerts
+    were compacted; the client should then resume from `last_seq`.
+    """
+    alerts = database.get_budget_alerts(since) if epoch in (None, database.epoch) else None
+    return BudgetAlertFeed(
+        epoch=database.epoch,
+        since=since,
+        last_seq=database.last_alert_seq,
+        reset=alerts is None,
+        alerts=alerts or []
+    )
+
+
+def _format_alert(alert: BudgetAlert) -> str:
+    """Format a budget alert as a server-sent event message."""
+    return format_event("alert", alert.seq, alert.model_dump_json())
+
+
+@router.get("/alerts/stream")
+async def stream_budget_alerts(
+    request: Request,
+    since: int = Query(0, ge=0, description="Replay alerts with a sequence number greater than this first"),
+    epoch: Optional[str] = Query(None, description="Epoch the client's `since` belongs to")
+):
+    """Stream budget alerts as server-sent events as soon as they are raised."""
+    since, epoch = resume_position(request, since, epoch)
+    return StreamingResponse(
+        event_stream(request, "budget_alerts", since, epoch, database.get_budget_alerts,
+                     lambda: database.last_alert_seq, _format_alert),
+        media_type="text/event-stream"
+    )
+
+
+@router.put("/{category}", response_model=Budget)
+async def set_budget(
+    category: ExpenseCategory = Path(..., description="The category to budget"),
+    budget: BudgetCreate = Body(...)
+):
+    """Create or replace the monthly budget of a category."""
+    if not budget.thresholds or any(threshold <= 0 for threshold in budget.thresholds):
+        raise HTTPException(status_code=400, detail="thresholds must be a non-empty list of positive fractions")
+    return database.set_budget(Budget(category=category, **budget.model_dump()))
+
+
+@router.delete("/{category}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(category: ExpenseCategory = Path(..., description="The category whose budget to delete")):
+    """Delete the budget of a category."""
+    success = database.delete_budget(category.value)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget not found")
@@ -1,9 +1,14 @@
 from datetime import date
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, Path, Body, status
+from fastapi import APIRouter, HTTPException, Query, Path, Body, Request, status
+from fastapi.responses import StreamingResponse
+from app.api.streaming import event_stream, format_event, resume_position
 from app.database import database
-from app.models import Expense, ExpenseCreate, ExpenseUpdate, ExpenseSummary, PeriodSummary
+from app.models import (
+    ChangeEvent, ChangeFeed, Expense, ExpenseCreate, ExpenseQuery, ExpenseSnapshot, ExpenseUpdate,
+    ExpenseSummary, PeriodSummary, PivotTable, QueryFilter, QueryResult
+)
 from app.utils import parse_date, get_date_range
 
 
@@ -19,28 +24,82 @@ async def get_expenses(
     max_amount: Optional[float] = Query(None, description="Filter by maximum amount")
 ):
     """Get all expenses with optional filtering."""
-    expenses = database.get_all_expenses()
-    
-    # Apply filters if provided
+    filters = []
     if category:
-        expenses = [exp for exp in expenses if exp.category == category]
-    
-    if start_date and end_date:
-        try:
-            start = parse_date(start_date)
-            end = parse_date(end_date)
-            expenses = [exp for exp in expenses if start <= exp.date <= end]
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-    
-    if min_amount is not None and max_amount is not None:
-        expenses = [exp for exp in expenses if min_amount <= exp.amount <= max_amount]
-    elif min_amount is not None:
-        expenses = [exp for exp in expenses if exp.amount >= min_amount]
-    elif max_amount is not None:
-        expenses = [exp for exp in expenses if exp.amount <= max_amount]
+        filters.append(QueryFilter(field="category", op="eq", value=category))
+    if start_date:
+        filters.append(QueryFilter(field="date", op="gte", value=start_date))
+    if end_date:
+        filters.append(QueryFilter(field="date", op="lte", value=end_date))
+    if min_amount is not None:
+        filters.append(QueryFilter(field="amount", op="gte", value=min_amount))
+    if max_amount is not None:
+        filters.append(QueryFilter(field="amount", op="lte", value=max_amount))
     
-    return expenses
+    try:
+        return database.query(ExpenseQuery(filters=filters)).expenses
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/query", response_model=QueryResult, response_model_exclude_none=True)
+async def query_expenses(query: ExpenseQuery):
+    """Run a composable filter/group-by/order/limit query over expenses."""
+    try:
+        return database.query(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/changes", response_model=ChangeFeed)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Return changes with a sequence number greater than this"),
+    epoch: Optional[str] = Query(None, description="Epoch the client's `since` belongs to")
+):
+    """Get the change feed of expense create/update/delete events.
+
+    `reset` is set when the client's position can no longer be resumed, either
+    because the server restarted (new epoch) or because the requested changes
+    were compacted; the client should then bootstrap from /changes/snapshot.
+    """
+    changes = database.get_changes(since) if epoch in (None, database.epoch) else None
+    return ChangeFeed(
+        epoch=database.epoch,
+        since=since,
+        last_seq=database.last_seq,
+        reset=changes is None,
+        changes=changes or []
+    )
+
+
+@router.get("/changes/snapshot", response_model=ExpenseSnapshot)
+async def get_changes_snapshot():
+    """Get all current expenses with the sequence number to follow the change feed from."""
+    return ExpenseSnapshot(
+        epoch=database.epoch,
+        last_seq=database.last_seq,
+        expenses=database.get_all_expenses()
+    )
+
+
+def _format_change(event: ChangeEvent) -> str:
+    """Format a change event as a server-sent event message."""
+    return format_event(event.type.value, event.seq, event.model_dump_json())
+
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Replay changes with a sequence number greater than this first"),
+    epoch: Optional[str] = Query(None, description="Epoch the client's `since` belongs to")
+):
+    """Stream expense change events as server-sent events."""
+    since, epoch = resume_position(request, since, epoch)
+    return StreamingResponse(
+        event_stream(request, "changes", since, epoch, database.get_changes,
+                     lambda: database.last_seq, _format_change),
+        media_type="text/event-stream"
+    )
 
 
 @router.get("/{expense_id}", response_model=Expense)
@@ -81,7 +140,10 @@ async def update_expense(
     updated_expense = existing_expense.model_copy(update=update_data)
     
     # Save the updated expense
-    result = database.update_expense(expense_id, updated_expense)
+    try:
+        result = database.update_expense(expense_id, updated_expense)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not result:
         raise HTTPException(status_code=500, detail="Failed to update expense")
     
@@ -124,5 +186,35 @@ async def get_period_summary(
             end = today
         
         return database.get_period_summary(start, end)
-    except ValueError as e:
+    except (OverflowError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/summary/pivot", response_model=PivotTable)
+async def get_pivot(
+    by: str = Query("month", pattern="^(year|month|day|weekday)$", description="Time grain: year, month, day or weekday"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD), default first expense date"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), default last expense date"),
+    category: Optional[str] = Query(None, description="Restrict the table to one category")
+):
+    """Get a category by time crosstab; use a finer grain on a narrower range to drill down."""
+    try:
+        start = parse_date(start_date) if start_date else None
+        end = parse_date(end_date) if end_date else None
+        return database.get_pivot(by, start, end, category)
+    except (OverflowError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/summary/monthly", response_model=Dict[str, float])
+async def get_monthly_trend(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD), default first expense or recurring start"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), default last expense date or today, whichever is later")
+):
+    """Get total spending per month, including scheduled recurring expenses."""
+    try:
+        start = parse_date(start_date) if start_date else None
+        end = parse_date(end_date) if end_date else None
+        return database.get_monthly_trend(start, end)
+    except (OverflowError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,78 @@
+from datetime import date
+from itertools import islice
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Path, status
+from app import recurrence
+from app.database import database
+from app.models import Expense, RecurringExpense, RecurringExpenseCreate
+from app.utils import parse_date
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[RecurringExpense])
+async def get_recurring_expenses():
+    """Get all recurring expense rules."""
+    return database.get_all_recurring_expenses()
+
+
+@router.get("/{recurring_id}", response_model=RecurringExpense)
+async def get_recurring_expense(recurring_id: str = Path(..., description="The ID of the recurring expense to get")):
+    """Get a specific recurring expense rule by ID."""
+    rule = database.get_recurring_expense(recurring_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+    return rule
+
+
+@router.post("/", response_model=RecurringExpense, status_code=status.HTTP_201_CREATED)
+async def create_recurring_expense(rule: RecurringExpenseCreate):
+    """Create a new recurring expense rule."""
+    if rule.end_date and rule.end_date < rule.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    return database.create_recurring_expense(RecurringExpense(**rule.model_dump()))
+
+
+@router.delete("/{recurring_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recurring_expense(recurring_id: str = Path(..., description="The ID of the recurring expense to delete")):
+    """Delete a recurring expense rule."""
+    success = database.delete_recurring_expense(recurring_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+
+
+@router.get("/{recurring_id}/occurrences", response_model=List[date])
+async def get_occurrences(
+    recurring_id: str = Path(..., description="The ID of the recurring expense"),
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of occurrences to return")
+):
+    """Preview the occurrence dates of a rule within a period without posting them."""
+    rule = database.get_recurring_expense(recurring_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+    try:
+        start = parse_date(start_date)
+        end = parse_date(end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return list(islice(recurrence.iter_occurrences(rule, start, end), limit))
+
+
+@router.post("/{recurring_id}/materialize", response_model=List[Expense])
+async def materialize_recurring_expense(
+    recurring_id: str = Path(..., description="The ID of the recurring expense"),
+    through: Optional[str] = Query(None, description="Post occurrences up to this date (YYYY-MM-DD), default today")
+):
+    """Post the pending occurrences of a rule as concrete expenses."""
+    try:
+        through_date = parse_date(through) if through else date.today()
+        created = database.materialize_recurring_expense(recurring_id, through_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if created is None:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+    return created
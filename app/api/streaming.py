@@ -0,0 +1,79 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import Request
+
+from app import config
+from app.database import database
+
+
+def resume_position(request: Request, since: int, epoch: Optional[str]) -> Tuple[int, Optional[str]]:
+    """Resume from the standard SSE reconnect header when the client sends one."""
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        last_epoch, _, last_seq = last_event_id.rpartition(":")
+        if last_seq.isdigit():
+            return int(last_seq), last_epoch or epoch
+    return since, epoch
+
+
+def format_event(name: str, seq: int, data: str) -> str:
+    """Format a server-sent event message."""
+    # Event IDs carry the epoch so that a reconnect after a restart is detected
+    return f"id: {database.epoch}:{seq}\nevent: {name}\ndata: {data}\n\n"
+
+
+def format_reset(last_seq: int) -> str:
+    """Format the server-sent event telling a client to bootstrap again."""
+    return format_event("reset", last_seq, json.dumps({"epoch": database.epoch, "last_seq": last_seq}))
+
+
+async def event_stream(request: Request, topic: str, since: int, epoch: Optional[str],
+                       replay: Callable[[int], Optional[List]], last_seq: Callable[[], int],
+                       format_item: Callable[[object], str]) -> AsyncIterator[str]:
+    """Replay a database feed from `since`, then follow it live.
+
+    `replay` returns the retained items after a sequence number, or None when
+    the position can no longer be resumed; the client is then sent a reset
+    event, as it is when it falls more than STREAM_QUEUE_SIZE items behind.
+    """
+    # Bounded so a stalled client cannot buffer every write indefinitely
+    queue: asyncio.Queue = asyncio.Queue(maxsize=config.STREAM_QUEUE_SIZE)
+    overflowed = False
+
+    def callback(item) -> None:
+        nonlocal overflowed
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            overflowed = True
+            database.unsubscribe(callback, topic)
+
+    # Subscribe before replaying so no item can fall between the two
+    database.subscribe(callback, topic)
+    try:
+        last_sent = since
+        items = replay(since) if epoch in (None, database.epoch) else None
+        if items is None:
+            yield format_reset(last_seq())
+            last_sent = last_seq()
+            items = []
+        for item in items:
+            yield format_item(item)
+            last_sent = item.seq
+        while not await request.is_disconnected():
+            if overflowed and queue.empty():
+                # Items were dropped; the client must bootstrap again
+                yield format_reset(last_seq())
+                return
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item.seq > last_sent:
+                yield format_item(item)
+                last_sent = item.seq
+    finally:
+        database.unsubscribe(callback, topic)
@@ -0,0 +1,29 @@
+import os
+from typing import Optional
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Seed the database with sample expenses on startup (demo/development only)
+DEMO_MODE: bool = _env_flag("EXPENSE_DEMO_MODE")
+
+# JSON snapshot loaded on startup if it exists and written back on shutdown
+SNAPSHOT_PATH: Optional[str] = os.environ.get("EXPENSE_SNAPSHOT_PATH") or None
+
+# Number of recent change feed events kept for incremental sync
+CHANGE_FEED_RETENTION: int = int(os.environ.get("EXPENSE_CHANGE_FEED_RETENTION") or 10000)
+
+# Number of recent budget alerts kept for polling clients
+BUDGET_ALERT_RETENTION: int = int(os.environ.get("EXPENSE_BUDGET_ALERT_RETENTION") or 1000)
+
+# Events buffered per streaming client before it is dropped and told to bootstrap again
+STREAM_QUEUE_SIZE: int = int(os.environ.get("EXPENSE_STREAM_QUEUE_SIZE") or 1000)
+
+# Fraction of requests to run under the sampling profiler (0 disables it)
+PROFILE_SAMPLE_RATE: float = float(os.environ.get("EXPENSE_PROFILE_SAMPLE_RATE") or 0)
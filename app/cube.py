@@ -0,0 +1,129 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Cells map a category to [total amount, expense count]
+Cells = Dict[str, List[float]]
+
+
+def _add_cell(cells: Cells, category: str, amount: float, count: int) -> None:
+    """Add an amount and count to a category cell, dropping cells that become empty."""
+    cell = cells.setdefault(category, [0.0, 0])
+    cell[0] += amount
+    cell[1] += count
+    if cell[1] == 0:
+        del cells[category]
+
+
+def _month_end(day: date) -> date:
+    """Last day of the month containing `day`."""
+    return day.replace(day=monthrange(day.year, day.month)[1])
+
+
+def _merge(into: Cells, cells: Cells, category: Optional[str] = None) -> None:
+    """Merge cells into an accumulator, optionally restricted to one category."""
+    if category is not None:
+        cells = {category: cells[category]} if category in cells else {}
+    for name, (amount, count) in cells.items():
+        cell = into.setdefault(name, [0.0, 0])
+        cell[0] += amount
+        cell[1] += count
+
+
+class ExpenseCube:
+    """Incrementally maintained category x (year, month, day) cube of sums and counts.
+
+    Range queries combine whole-year and whole-month cells with day cells at
+    the edges, so their cost depends on the length of the range, never on the
+    number of expenses.
+    """
+
+    def __init__(self):
+        self.years: Dict[int, Cells] = {}
+        self.months: Dict[Tuple[int, int], Cells] = {}
+        self.days: Dict[date, Cells] = {}
+
+    def add(self, category: str, day: date, amount: float) -> None:
+        """Record an expense in every level of the cube."""
+        self._apply(category, day, amount, 1)
+
+    def remove(self, category: str, day: date, amount: float) -> None:
+        """Remove a previously recorded expense from every level of the cube."""
+        self._apply(category, day, -amount, -1)
+
+    def _apply(self, category: str, day: date, amount: float, count: int) -> None:
+        for level, key in ((self.years, day.year), (self.months, (day.year, day.month)), (self.days, day)):
+            cells = level.setdefault(key, {})
+            _add_cell(cells, category, amount, count)
+            if not cells:
+                del level[key]
+
+    def month_total(self, category: str, year: int, month: int) -> float:
+        """Total amount of a category in one month, in constant time."""
+        cell = self.months.get((year, month), {}).get(category)
+        return cell[0] if cell else 0.0
+
+    def date_span(self) -> Optional[Tuple[date, date]]:
+        """First and last dates holding any expense, or None if the cube is empty."""
+        if not self.days:
+            return None
+        return min(self.days), max(self.days)
+
+    def range_totals(self, start_date: date, end_date: date, category: Optional[str] = None) -> Cells:
+        """Totals per category over [start_date, end_date], combining coarse and fine cells."""
+        totals: Cells = {}
+        day = start_date
+        while day <= end_date:
+            if day.month == 1 and day.day == 1 and date(day.year, 12, 31) <= end_date:
+                last = date(day.year, 12, 31)
+                _merge(totals, self.years.get(day.year, {}), category)
+            elif day.day == 1 and _month_end(day) <= end_date:
+                last = _month_end(day)
+                _merge(totals, self.months.get((day.year, day.month), {}), category)
+            else:
+                last = day
+                _merge(totals, self.days.get(day, {}), category)
+            # Stop before stepping past end_date, which may be date.max
+            if last >= end_date:
+                break
+            day = last + timedelta(days=1)
+        return totals
+
+    def pivot(self, by: str, start_date: date, end_date: date,
+              category: Optional[str] = None) -> Dict[str, Cells]:
+        """Crosstab of category against a time grain ("year", "month", "day" or "weekday").
+
+        Coarser grains roll up finer ones; drill down by narrowing the range
+        and asking for a finer grain.
+        """
+        table: Dict[str, Cells] = {}
+        if by in ("day", "weekday"):
+            # Only days holding expenses have cells, so visit those instead of the calendar
+            for day in sorted(day for day in self.days if start_date <= day <= end_date):
+                cells: Cells = {}
+                _merge(cells, self.days[day], category)
+                if not cells:
+                    continue
+                if by == "day":
+                    table[day.isoformat()] = cells
+                else:
+                    _merge(table.setdefault(WEEKDAYS[day.weekday()], {}), cells)
+            if by == "weekday":
+                return {name: table[name] for name in WEEKDAYS if name in table}
+            return table
+
+        if by not in ("year", "month"):
+            raise ValueError(f"Invalid pivot grain: {by}")
+        bucket = date(start_date.year, 1, 1) if by == "year" else start_date.replace(day=1)
+        while bucket <= end_date:
+            last = date(bucket.year, 12, 31) if by == "year" else _month_end(bucket)
+            cells = self.range_totals(max(bucket, start_date), min(last, end_date), category)
+            if cells:
+                table[str(bucket.year) if by == "year" else bucket.strftime("%Y-%m")] = cells
+            if last >= end_date:
+                break
+            bucket = last + timedelta(days=1)
+        return table
@@ -1,9 +1,19 @@
+import json
+import os
 from datetime import datetime, date
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 from functools import reduce
 
-from app.models import Expense, ExpenseSummary, PeriodSummary
+from app import config, recurrence
+from app.cube import ExpenseCube
+from app.indexes import HashIndex, SortedIndex
+from app.metrics import instrumented, store_rows_scanned
+from app.models import (
+    Budget, BudgetAlert, BudgetStatus, ChangeEvent, ChangeType, Expense, ExpenseQuery, ExpenseSummary, PeriodSummary, PivotCell, PivotTable,
+    QueryResult, RecurringExpense
+)
+from app.query import execute_query
 
 
 class InMemoryDatabase:
@@ -11,15 +21,39 @@ class InMemoryDatabase:
     
     def __init__(self):
         self.expenses: Dict[str, Expense] = {}
+        # Change feed; sequence numbers are only meaningful within one epoch
+        self.epoch = str(uuid4())
+        # Only the most recent events are retained; changes[i] has seq == changes_offset + i + 1
+        self.changes: List[ChangeEvent] = []
+        self.changes_offset = 0
+        # Callbacks notified of new items, per topic ("changes" or "budget_alerts")
+        self.subscribers: Dict[str, List[Callable]] = {"changes": [], "budget_alerts": []}
+        # Recurring rules are stored compactly and only expanded on demand
+        self.recurring: Dict[str, RecurringExpense] = {}
+        # Secondary indexes used by the query planner
+        self.category_index = HashIndex()
+        self.date_index = SortedIndex()
+        self.amount_index = SortedIndex()
+        # Category x time aggregates kept in sync on every write
+        self.cube = ExpenseCube()
+        # Monthly budgets per category; spend is read from the cube's month cells
+        self.budgets: Dict[str, Budget] = {}
+        # Alert log retained like the change feed; budget_alerts[i] has seq == budget_alerts_offset + i + 1
+        self.budget_alerts: List[BudgetAlert] = []
+        self.budget_alerts_offset = 0
         
+    @instrumented("get_all_expenses")
     def get_all_expenses(self) -> List[Expense]:
         """Get all expenses from the database."""
+        store_rows_scanned.inc("get_all_expenses", amount=len(self.expenses))
         return list(self.expenses.values())
     
+    @instrumented("get_expense")
     def get_expense(self, expense_id: str) -> Optional[Expense]:
         """Get a specific expense by ID."""
         return self.expenses.get(expense_id)
     
+    @instrumented("create_expense")
     def create_expense(self, expense: Expense) -> Expense:
         """Create a new expense record."""
         # Generate a UUID if not provided
@@ -31,9 +65,19 @@ class InMemoryDatabase:
             expense.date = date.today()
         
         # Store the expense in the database
+        self._check_indexable(expense)
+        previous = self.expenses.get(expense.id)
+        spend_before = self._budget_spend(previous, expense)
+        if previous is not None:
+            self._unindex(previous)
         self.expenses[expense.id] = expense
+        self._index(expense)
+        self._check_budgets(spend_before)
+        change_type = ChangeType.CREATE if previous is None else ChangeType.UPDATE
+        self._record_change(change_type, expense.id, expense)
         return expense
     
+    @instrumented("update_expense")
     def update_expense(self, expense_id: str, expense_data: Expense) -> Optional[Expense]:
         """Update an existing expense record."""
         if expense_id not in self.expenses:
@@ -41,18 +85,137 @@ class InMemoryDatabase:
         
         # Update the expense with new data while preserving the ID
         updated_expense = expense_data.model_copy(update={"id": expense_id})
+        # Validate before touching the indexes so a bad update cannot leave them half-written
+        self._check_indexable(updated_expense)
+        spend_before = self._budget_spend(self.expenses[expense_id], updated_expense)
+        self._unindex(self.expenses[expense_id])
         self.expenses[expense_id] = updated_expense
+        self._index(updated_expense)
+        self._check_budgets(spend_before)
+        self._record_change(ChangeType.UPDATE, expense_id, updated_expense)
         return updated_expense
     
+    @instrumented("delete_expense")
     def delete_expense(self, expense_id: str) -> bool:
         """Delete an expense record."""
         if expense_id in self.expenses:
-            del self.expenses[expense_id]
+            self._unindex(self.expenses.pop(expense_id))
+            self._record_change(ChangeType.DELETE, expense_id)
             return True
         return False
     
+    def _check_indexable(self, expense: Expense) -> None:
+        """Ensure an expense has every field the indexes and the cube are keyed on."""
+        for field in ("category", "date", "amount"):
+            if getattr(expense, field) is None:
+                raise ValueError(f"Expense {field} must not be null")
+    
+    def _index(self, expense: Expense) -> None:
+        """Add an expense to the secondary indexes and the cube."""
+        self.category_index.add(expense.category, expense.id)
+        self.date_index.add(expense.date, expense.id)
+        self.amount_index.add(expense.amount, expense.id)
+        self.cube.add(expense.category, expense.date, expense.amount)
+    
+    def _unindex(self, expense: Expense) -> None:
+        """Remove an expense from the secondary indexes and the cube."""
+        self.category_index.remove(expense.category, expense.id)
+        self.date_index.remove(expense.date, expense.id)
+        self.amount_index.remove(expense.amount, expense.id)
+        self.cube.remove(expense.category, expense.date, expense.amount)
+    
+    def _budget_spend(self, *expenses: Optional[Expense]) -> Dict[Tuple[str, int, int], float]:
+        """Current month spend for the budgeted (category, month) cells an expense write touches."""
+        spend = {}
+        for expense in expenses:
+            if expense is not None and expense.category in self.budgets:
+                key = (expense.category, expense.date.year, expense.date.month)
+                spend[key] = self.cube.month_total(*key)
+        return spend
+    
+    def _check_budgets(self, spend_before: Dict[Tuple[str, int, int], float]) -> None:
+        """Raise an alert for every budget threshold crossed upwards by a write."""
+        for (category, year, month), before in spend_before.items():
+            after = self.cube.month_total(category, year, month)
+            if after <= before:
+                continue
+            budget = self.budgets[category]
+            for threshold in budget.thresholds:
+                if before < threshold * budget.monthly_limit <= after:
+                    self._raise_alert(budget, year, month, threshold, after)
+    
+    def _raise_alert(self, budget: Budget, year: int, month: int, threshold: float, spent: float) -> None:
+        """Append a threshold crossing to the budget alert log and notify subscribers."""
+        alert = BudgetAlert(
+            seq=self.last_alert_seq + 1,
+            category=budget.category,
+            month=f"{year:04d}-{month:02d}",
+            threshold=threshold,
+            monthly_limit=budget.monthly_limit,
+            spent=spent
+        )
+        self.budget_alerts.append(alert)
+        retention = config.BUDGET_ALERT_RETENTION
+        if len(self.budget_alerts) >= 2 * retention:
+            del self.budget_alerts[:len(self.budget_alerts) - retention]
+            self.budget_alerts_offset = alert.seq - retention
+        for callback in list(self.subscribers["budget_alerts"]):
+            callback(alert)
+    
+    @instrumented("query")
+    def query(self, query: ExpenseQuery) -> QueryResult:
+        """Run a composable query, driven by the most selective index."""
+        return execute_query(self, query)
+    
+    def _record_change(self, change_type: ChangeType, expense_id: str,
+                       expense: Optional[Expense] = None) -> ChangeEvent:
+        """Append an event to the change feed and notify subscribers."""
+        event = ChangeEvent(
+            seq=self.last_seq + 1,
+            type=change_type,
+            expense_id=expense_id,
+            expense=expense
+        )
+        self.changes.append(event)
+        # Compact in batches so trimming the feed stays amortized O(1) per write
+        retention = config.CHANGE_FEED_RETENTION
+        if len(self.changes) >= 2 * retention:
+            del self.changes[:len(self.changes) - retention]
+            self.changes_offset = event.seq - retention
+        for callback in list(self.subscribers["changes"]):
+            callback(event)
+        return event
+    
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent change (0 if none)."""
+        return self.changes_offset + len(self.changes)
+    
+    @instrumented("get_changes")
+    def get_changes(self, since: int = 0) -> Optional[List[ChangeEvent]]:
+        """Get all change events with a sequence number greater than `since`.
+        
+        Returns None if `since` cannot be resumed from: some of those events have
+        already been compacted away, or it lies beyond the end of the feed.
+        """
+        if since < self.changes_offset or since > self.last_seq:
+            return None
+        # Sequence numbers are dense, so the feed can be sliced directly
+        return self.changes[since - self.changes_offset:]
+    
+    def subscribe(self, callback: Callable, topic: str = "changes") -> None:
+        """Register a callback invoked with every new change event or, for "budget_alerts", alert."""
+        self.subscribers[topic].append(callback)
+    
+    def unsubscribe(self, callback: Callable, topic: str = "changes") -> None:
+        """Remove a previously registered callback."""
+        if callback in self.subscribers[topic]:
+            self.subscribers[topic].remove(callback)
+    
+    @instrumented("get_expense_summary")
     def get_expense_summary(self) -> List[ExpenseSummary]:
         """Get a summary of expenses grouped by category."""
+        store_rows_scanned.inc("get_expense_summary", amount=len(self.expenses))
         # Group expenses by category
         categories = {}
         for expense in self.expenses.values():
@@ -74,53 +237,239 @@ class InMemoryDatabase:
             ) for data in categories.values()
         ]
     
+    @instrumented("get_period_summary")
     def get_period_summary(self, start_date: date, end_date: date) -> PeriodSummary:
         """Get a summary of expenses for a specific period."""
-        # Filter expenses by date range
-        filtered_expenses = list(filter(
-            lambda exp: start_date <= exp.date <= end_date,
-            self.expenses.values()
-        ))
+        # Read the category totals from the cube instead of scanning expenses
+        cells = self.cube.range_totals(start_date, end_date)
+        categories = {category: amount for category, (amount, count) in cells.items()}
         
         # Calculate total amount using reduce
-        total_amount = reduce(
-            lambda acc, exp: acc + exp.amount,
-            filtered_expenses,
-            0.0
-        )
+        total_amount = reduce(lambda acc, cell: acc + cell[0], cells.values(), 0.0)
+        total_expenses = sum(count for amount, count in cells.values())
         
-        # Group by category
-        categories = {}
-        for expense in filtered_expenses:
-            if expense.category not in categories:
-                categories[expense.category] = 0
-            categories[expense.category] += expense.amount
+        # Add scheduled recurring occurrences by counting them, not expanding them
+        for rule in self.recurring.values():
+            occurrences = recurrence.count_occurrences(rule, start_date, end_date)
+            if occurrences:
+                total_amount += rule.amount * occurrences
+                total_expenses += occurrences
+                categories[rule.category] = categories.get(rule.category, 0) + rule.amount * occurrences
         
         # Create and return the period summary
         return PeriodSummary(
             start_date=start_date,
             end_date=end_date,
             total_amount=total_amount,
-            total_expenses=len(filtered_expenses),
+            total_expenses=total_expenses,
             category_breakdown=categories
         )
     
+    @instrumented("get_pivot")
+    def get_pivot(self, by: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  category: Optional[str] = None) -> PivotTable:
+        """Get a category by time crosstab from the cube, defaulting to the full date span."""
+        span = self.cube.date_span()
+        if span is None:
+            span = (date.today(), date.today())
+        start_date = start_date or span[0]
+        end_date = end_date or span[1]
+        table = self.cube.pivot(by, start_date, end_date, category)
+        return PivotTable(
+            by=by,
+            start_date=start_date,
+            end_date=end_date,
+            cells={
+                bucket: {
+                    name: PivotCell(total_amount=amount, expense_count=count)
+                    for name, (amount, count) in cells.items()
+                }
+                for bucket, cells in table.items()
+            }
+        )
+    
+    @instrumented("get_monthly_trend")
+    def get_monthly_trend(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[str, float]:
+        """Get total spending per month, including scheduled recurring occurrences.
+        
+        The range defaults to the full history: from the first expense or
+        recurring rule through the last expense or today, whichever is later.
+        """
+        today = date.today()
+        span = self.cube.date_span()
+        if start_date is None:
+            firsts = [rule.start_date for rule in self.recurring.values()]
+            if span is not None:
+                firsts.append(span[0])
+            start_date = min(firsts, default=today)
+        if end_date is None:
+            end_date = max(span[1], today) if span is not None else today
+        trend = {
+            month: sum(amount for amount, count in cells.values())
+            for month, cells in self.cube.pivot("month", start_date, end_date).items()
+        }
+        for month, amount in recurrence.monthly_totals(self.recurring.values(), start_date, end_date).items():
+            trend[month] = trend.get(month, 0.0) + amount
+        return dict(sorted(trend.items()))
+    
+    def get_all_budgets(self) -> List[Budget]:
+        """Get all category budgets."""
+        return list(self.budgets.values())
+    
+    def set_budget(self, budget: Budget, raise_alerts: bool = True) -> Budget:
+        """Create or replace the monthly budget of a category.
+        
+        Thresholds the current month has already reached raise their alert
+        right away, unless the budget being replaced had reached them too or
+        `raise_alerts` is False (when restoring a snapshot).
+        """
+        budget.thresholds = sorted(set(budget.thresholds))
+        previous = self.budgets.get(budget.category.value)
+        self.budgets[budget.category.value] = budget
+        if not raise_alerts:
+            return budget
+        
+        today = date.today()
+        spent = self.cube.month_total(budget.category.value, today.year, today.month)
+        already_crossed = set()
+        if previous is not None:
+            already_crossed = {t for t in previous.thresholds if spent >= t * previous.monthly_limit}
+        for threshold in budget.thresholds:
+            if threshold not in already_crossed and spent >= threshold * budget.monthly_limit:
+                self._raise_alert(budget, today.year, today.month, threshold, spent)
+        return budget
+    
+    def delete_budget(self, category: str) -> bool:
+        """Delete the budget of a category."""
+        if category in self.budgets:
+            del self.budgets[category]
+            return True
+        return False
+    
+    def get_budget_status(self, year: int, month: int) -> List[BudgetStatus]:
+        """Get spend against every budget for one month, in constant time per category."""
+        statuses = []
+        for category, budget in self.budgets.items():
+            spent = self.cube.month_total(category, year, month)
+            statuses.append(BudgetStatus(
+                category=category,
+                month=f"{year:04d}-{month:02d}",
+                monthly_limit=budget.monthly_limit,
+                spent=spent,
+                remaining=budget.monthly_limit - spent,
+                percent_used=spent / budget.monthly_limit * 100,
+                crossed_thresholds=[t for t in budget.thresholds if spent >= t * budget.monthly_limit]
+            ))
+        return statuses
+    
+    @property
+    def last_alert_seq(self) -> int:
+        """Sequence number of the most recent budget alert (0 if none)."""
+        return self.budget_alerts_offset + len(self.budget_alerts)
+    
+    def get_budget_alerts(self, since: int = 0) -> Optional[List[BudgetAlert]]:
+        """Get the budget alerts with a sequence number greater than `since`.
+        
+        Returns None if `since` cannot be resumed from, like get_changes.
+        """
+        if since < self.budget_alerts_offset or since > self.last_alert_seq:
+            return None
+        return self.budget_alerts[since - self.budget_alerts_offset:]
+    
+    def get_all_recurring_expenses(self) -> List[RecurringExpense]:
+        """Get all recurring expense rules."""
+        return list(self.recurring.values())
+    
+    def get_recurring_expense(self, recurring_id: str) -> Optional[RecurringExpense]:
+        """Get a specific recurring expense rule by ID."""
+        return self.recurring.get(recurring_id)
+    
+    def create_recurring_expense(self, rule: RecurringExpense) -> RecurringExpense:
+        """Create a new recurring expense rule."""
+        if not rule.id:
+            rule.id = str(uuid4())
+        self.recurring[rule.id] = rule
+        return rule
+    
+    def delete_recurring_expense(self, recurring_id: str) -> bool:
+        """Delete a recurring expense rule; already posted expenses are kept."""
+        if recurring_id in self.recurring:
+            del self.recurring[recurring_id]
+            return True
+        return False
+    
+    @instrumented("materialize_recurring_expense")
+    def materialize_recurring_expense(self, recurring_id: str, through: date) -> Optional[List[Expense]]:
+        """Post the pending occurrences of a rule up to `through` as concrete expenses."""
+        rule = self.recurring.get(recurring_id)
+        if rule is None:
+            return None
+        if through > date.today() + recurrence.MATERIALIZE_HORIZON:
+            raise ValueError(
+                f"Cannot materialize beyond {recurrence.MATERIALIZE_HORIZON.days} days from today"
+            )
+        
+        start = recurrence.pending_start(rule, rule.start_date)
+        created = [
+            self.create_expense(recurrence.to_expense(rule, day))
+            for day in recurrence.iter_occurrences(rule, start, through)
+        ]
+        if not rule.materialized_through or through > rule.materialized_through:
+            rule.materialized_through = through
+        return created
+    
+    @instrumented("filter_expenses_by_category")
     def filter_expenses_by_category(self, category: str) -> List[Expense]:
         """Filter expenses by category."""
+        store_rows_scanned.inc("filter_expenses_by_category", amount=len(self.expenses))
         return list(filter(
             lambda exp: exp.category == category,
             self.expenses.values()
         ))
     
+    @instrumented("filter_expenses_by_date_range")
     def filter_expenses_by_date_range(self, start_date: date, end_date: date) -> List[Expense]:
         """Filter expenses by date range."""
+        store_rows_scanned.inc("filter_expenses_by_date_range", amount=len(self.expenses))
         return list(filter(
             lambda exp: start_date <= exp.date <= end_date,
             self.expenses.values()
         ))
     
+    def load_snapshot(self, path: str) -> int:
+        """Load expenses from a JSON snapshot file and return how many were loaded."""
+        with open(path) as f:
+            snapshot = json.load(f)
+        # Older snapshots are a bare list of expenses
+        if isinstance(snapshot, list):
+            snapshot = {"expenses": snapshot}
+        for record in snapshot.get("recurring", []):
+            self.create_recurring_expense(RecurringExpense.model_validate(record))
+        for record in snapshot["expenses"]:
+            self.create_expense(Expense.model_validate(record))
+        # Budgets go last so that replaying history does not raise alerts again
+        for record in snapshot.get("budgets", []):
+            self.set_budget(Budget.model_validate(record), raise_alerts=False)
+        return len(snapshot["expenses"])
+    
+    def save_snapshot(self, path: str) -> None:
+        """Write all expenses to a JSON snapshot file."""
+        snapshot = {
+            "expenses": [expense.model_dump(mode="json") for expense in self.expenses.values()],
+            "recurring": [rule.model_dump(mode="json") for rule in self.recurring.values()],
+            "budgets": [budget.model_dump(mode="json") for budget in self.budgets.values()],
+        }
+        # Write to a temporary file first so a crash never leaves a truncated snapshot
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    
+    @instrumented("filter_expenses_by_amount_range")
     def filter_expenses_by_amount_range(self, min_amount: float, max_amount: float) -> List[Expense]:
         """Filter expenses by amount range."""
+        store_rows_scanned.inc("filter_expenses_by_amount_range", amount=len(self.expenses))
         return list(filter(
             lambda exp: min_amount <= exp.amount <= max_amount,
             self.expenses.values()
@@ -171,5 +520,9 @@ def add_sample_expenses():
         database.create_expense(expense)
 
 
-# Add sample expenses when the module is imported
-add_sample_expenses()
+def initialize_database():
+    """Populate the database on startup according to the configuration."""
+    if config.SNAPSHOT_PATH and os.path.exists(config.SNAPSHOT_PATH):
+        database.load_snapshot(config.SNAPSHOT_PATH)
+    elif config.DEMO_MODE:
+        add_sample_expenses()
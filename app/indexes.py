@@ -0,0 +1,95 @@
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class HashIndex:
+    """Secondary index mapping an exact key to the IDs of the expenses having it."""
+
+    def __init__(self):
+        # Buckets are dicts used as ordered sets, so lookups return IDs in insertion order
+        self.buckets: Dict[Any, Dict[str, None]] = {}
+
+    def add(self, key: Any, expense_id: str) -> None:
+        """Add an expense ID under a key."""
+        self.buckets.setdefault(key, {})[expense_id] = None
+
+    def remove(self, key: Any, expense_id: str) -> None:
+        """Remove an expense ID from a key."""
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.pop(expense_id, None)
+            if not bucket:
+                del self.buckets[key]
+
+    def count(self, keys: Iterable[Any]) -> int:
+        """Number of IDs stored under any of the given keys."""
+        return sum(len(self.buckets.get(key, ())) for key in keys)
+
+    def lookup(self, keys: Iterable[Any]) -> Iterator[str]:
+        """Lazily yield the IDs stored under any of the given keys."""
+        for key in keys:
+            yield from self.buckets.get(key, ())
+
+
+class _Top:
+    """Sentinel comparing greater than any expense ID, for bisecting past equal keys."""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return not isinstance(other, _Top)
+
+
+_TOP = _Top()
+
+
+class SortedIndex:
+    """Secondary index keeping expense IDs ordered by a key, for range lookups."""
+
+    def __init__(self):
+        # (key, expense_id) pairs in ascending order; the ID makes every entry unique
+        self.entries: List[Tuple[Any, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, key: Any, expense_id: str) -> None:
+        """Add an expense ID under a key."""
+        insort(self.entries, (key, expense_id))
+
+    def remove(self, key: Any, expense_id: str) -> None:
+        """Remove an expense ID from a key."""
+        entry = (key, expense_id)
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def _bounds(self, low: Optional[Any], high: Optional[Any],
+                low_inclusive: bool = True, high_inclusive: bool = True) -> range:
+        """Get the positions of the entries with keys within the given bounds."""
+        # (key,) sorts before every entry with that key and (key, _TOP) after all of them
+        if low is None:
+            start = 0
+        else:
+            start = bisect_left(self.entries, (low,) if low_inclusive else (low, _TOP))
+        if high is None:
+            end = len(self.entries)
+        else:
+            end = bisect_left(self.entries, (high, _TOP) if high_inclusive else (high,))
+        return range(start, max(start, end))
+
+    def count(self, low: Optional[Any] = None, high: Optional[Any] = None,
+              low_inclusive: bool = True, high_inclusive: bool = True) -> int:
+        """Number of IDs with keys within the given bounds, in logarithmic time."""
+        return len(self._bounds(low, high, low_inclusive, high_inclusive))
+
+    def lookup(self, low: Optional[Any] = None, high: Optional[Any] = None,
+               low_inclusive: bool = True, high_inclusive: bool = True,
+               descending: bool = False) -> Iterator[str]:
+        """Lazily yield the IDs with keys within the given bounds, in key order."""
+        positions = self._bounds(low, high, low_inclusive, high_inclusive)
+        if descending:
+            positions = reversed(positions)
+        for position in positions:
+            yield self.entries[position][1]
@@ -1,12 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import expenses
+from fastapi.responses import PlainTextResponse
+from app import config
+from app.api.endpoints import budgets, expenses, recurring
+from app.database import database, initialize_database
+from app.metrics import MetricsMiddleware, registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Populate the database on startup and persist it to the configured snapshot file on shutdown."""
+    initialize_database()
+    yield
+    if config.SNAPSHOT_PATH:
+        database.save_snapshot(config.SNAPSHOT_PATH)
+
 
 # Create FastAPI application
 app = FastAPI(
     title="Expense Tracking System",
     description="A FastAPI-based expense tracking system with in-memory database",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow cross-origin requests from the Streamlit frontend
@@ -18,8 +35,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency (and optionally sample the profiler) for every request
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(expenses.router, prefix="/expenses", tags=["expenses"])
+app.include_router(recurring.router, prefix="/recurring", tags=["recurring"])
+app.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 
 
 @app.get("/", tags=["root"])
@@ -28,6 +50,12 @@ async def read_root():
     return {"message": "Welcome to the Expense Tracking System API"}
 
 
+@app.get("/metrics", tags=["monitoring"], response_class=PlainTextResponse)
+async def read_metrics():
+    """Expose request and store metrics in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,258 @@
+import cProfile
+import io
+import logging
+import pstats
+import random
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from app import config
+
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond store calls up to slow requests
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    """Format a label set in Prometheus exposition syntax."""
+    pairs = [
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """A monotonically increasing counter with optional labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Increment the counter for the given label values."""
+        self.values[labelvalues] = self.values.get(labelvalues, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        """Get the current value for the given label values."""
+        return self.values.get(labelvalues, 0.0)
+
+    def collect(self) -> List[str]:
+        """Render the counter samples as exposition lines."""
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Histogram:
+    """A cumulative bucketed histogram with optional labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record a single observation for the given label values."""
+        counts = self.counts.get(labelvalues)
+        if counts is None:
+            counts = self.counts[labelvalues] = [0] * (len(self.buckets) + 1)
+            self.sums[labelvalues] = 0.0
+        # Buckets are upper-inclusive, so the first bound >= value receives it
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labelvalues] += value
+
+    def count(self, *labelvalues: str) -> int:
+        """Get the number of observations for the given label values."""
+        return sum(self.counts.get(labelvalues, ()))
+
+    def collect(self) -> List[str]:
+        """Render the histogram samples as exposition lines."""
+        lines = []
+        for labels, counts in sorted(self.counts.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {self.sums[labels]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registry of metrics rendered together on the /metrics endpoint."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Union[Counter, Histogram]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all registered metrics in Prometheus text format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Registry and metrics shared by the API and the store
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds by route",
+    ("method", "route", "status")
+)
+store_operation_duration = registry.histogram(
+    "store_operation_duration_seconds",
+    "In-memory store operation latency in seconds",
+    ("operation",)
+)
+store_rows_scanned = registry.counter(
+    "store_rows_scanned_total",
+    "Number of expense rows visited by store operations",
+    ("operation",)
+)
+store_index_lookups = registry.counter(
+    "store_index_lookups_total",
+    "Number of queries driven by a secondary index instead of a full scan",
+    ("index",)
+)
+
+
+def instrumented(operation: str) -> Callable:
+    """Decorator that records the latency of a store operation."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                store_operation_duration.observe(time.perf_counter() - start, operation)
+        return wrapper
+    return decorator
+
+
+def _log_profile(route: str, stats: pstats.Stats) -> None:
+    """Default profiler hook: log the most expensive calls of a sampled request."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(20)
+    logger.info("Profile for %s:\n%s", route, stream.getvalue())
+
+
+class RequestProfiler:
+    """Opt-in sampling profiler run around a fraction of requests."""
+
+    def __init__(self, sample_rate: float = 0.0, hook: Callable[[str, pstats.Stats], None] = _log_profile):
+        self.sample_rate = sample_rate
+        self.hook = hook
+        self.active = False
+
+    def should_sample(self) -> bool:
+        """Decide whether the next request should be profiled."""
+        # cProfile hooks the whole thread, so only one request is profiled at a time
+        return self.sample_rate > 0 and not self.active and random.random() < self.sample_rate
+
+
+profiler = RequestProfiler(sample_rate=config.PROFILE_SAMPLE_RATE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and sampling the profiler."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        profile = None
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            elapsed = time.perf_counter() - start
+            # The router stores the matched route in the scope; use its template
+            # so that /expenses/{expense_id} is a single series
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(elapsed, scope["method"], route_path, str(status_code))
+            if profile is not None:
+                profile.disable()
+                profiler.active = False
+                try:
+                    profiler.hook(route_path, pstats.Stats(profile))
+                except Exception:
+                    logger.exception("Profiler hook failed")
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Event streams stay open for the life of the connection, so
+                # record their time to response start instead
+                headers = dict(message.get("headers", ()))
+                if headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    finish()
+            await send(message)
+
+        if profiler.should_sample():
+            profile = cProfile.Profile()
+            profiler.active = True
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
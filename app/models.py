@@ -1,7 +1,7 @@
 from datetime import date as date_type, datetime
 from enum import Enum
-from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, field_validator
 from uuid import uuid4
 
 
@@ -43,6 +43,14 @@ class ExpenseUpdate(BaseModel):
     description: Optional[str] = Field(default=None, description="Expense description")
     date: Optional[date_type] = Field(default=None, description="Expense date")
 
+    @field_validator("amount", "category", "date", mode="before")
+    @classmethod
+    def reject_null(cls, value):
+        """Fields may be omitted but not explicitly cleared."""
+        if value is None:
+            raise ValueError("may be omitted but not set to null")
+        return value
+
 
 class ExpenseSummary(BaseModel):
     """Model for expense summary by category."""
@@ -58,3 +66,184 @@ class PeriodSummary(BaseModel):
     total_amount: float
     total_expenses: int
     category_breakdown: Dict[str, float]
+
+
+class ChangeType(str, Enum):
+    """Enumeration of change feed event types."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ChangeEvent(BaseModel):
+    """Model for a single entry in the expense change feed."""
+    seq: int = Field(description="Monotonically increasing sequence number")
+    type: ChangeType = Field(description="Kind of change")
+    expense_id: str = Field(description="ID of the affected expense")
+    expense: Optional[Expense] = Field(default=None, description="Expense state after the change (None for deletes)")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Time the change was recorded")
+
+
+class ChangeFeed(BaseModel):
+    """Model for a batch of change events since a given sequence number."""
+    epoch: str = Field(description="Identifies the database instance; sequence numbers restart when it changes")
+    since: int
+    last_seq: int
+    reset: bool = Field(
+        default=False,
+        description="The requested changes are no longer retained; clients must bootstrap again"
+    )
+    changes: List[ChangeEvent]
+
+
+class ExpenseSnapshot(BaseModel):
+    """Model for the full current expense list, used to bootstrap change feed clients."""
+    epoch: str
+    last_seq: int
+    expenses: List[Expense]
+
+
+class RecurrenceFrequency(str, Enum):
+    """Enumeration of recurrence frequencies."""
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+
+class RecurringExpense(BaseModel):
+    """Model for a recurring expense rule, expanded into expenses lazily."""
+    id: Optional[str] = Field(default_factory=lambda: str(uuid4()))
+    amount: float = Field(gt=0, description="Amount of each occurrence")
+    category: str = Field(description="Expense category")
+    description: Optional[str] = Field(default=None, description="Expense description")
+    frequency: RecurrenceFrequency = Field(description="How often the expense recurs")
+    interval: int = Field(default=1, ge=1, description="Number of periods between occurrences")
+    start_date: date_type = Field(description="Date of the first occurrence")
+    end_date: Optional[date_type] = Field(default=None, description="Last possible occurrence date")
+    count: Optional[int] = Field(default=None, ge=1, description="Maximum number of occurrences")
+    materialized_through: Optional[date_type] = Field(
+        default=None, description="Occurrences up to this date have been posted as expenses"
+    )
+    created_at: datetime = Field(default_factory=datetime.now, description="Record creation timestamp")
+
+
+class RecurringExpenseCreate(BaseModel):
+    """Model for creating a new recurring expense rule."""
+    amount: float = Field(gt=0, description="Amount of each occurrence")
+    category: str = Field(description="Expense category")
+    description: Optional[str] = Field(default=None, description="Expense description")
+    frequency: RecurrenceFrequency = Field(description="How often the expense recurs")
+    interval: int = Field(default=1, ge=1, description="Number of periods between occurrences")
+    start_date: date_type = Field(description="Date of the first occurrence")
+    end_date: Optional[date_type] = Field(default=None, description="Last possible occurrence date")
+    count: Optional[int] = Field(default=None, ge=1, description="Maximum number of occurrences")
+
+
+class QueryFilter(BaseModel):
+    """Model for a single predicate in an expense query."""
+    field: Literal["category", "date", "amount", "description"] = Field(description="Field to filter on")
+    op: Literal["eq", "ne", "in", "gt", "gte", "lt", "lte", "between", "contains"] = Field(
+        description="Comparison operator"
+    )
+    value: Any = Field(description="Operand; a two-item list for 'between' and a list for 'in'")
+
+
+class ExpenseQuery(BaseModel):
+    """Model for a composable expense query."""
+    filters: List[QueryFilter] = Field(default_factory=list, description="Predicates combined with AND")
+    group_by: Optional[Literal["category", "date", "month"]] = Field(
+        default=None, description="Aggregate matching expenses by this key"
+    )
+    order_by: Optional[Literal["date", "-date", "amount", "-amount", "category", "-category"]] = Field(
+        default=None, description="Sort field; prefix with '-' for descending"
+    )
+    limit: Optional[int] = Field(default=None, ge=1, description="Maximum number of rows or groups")
+    explain: bool = Field(default=False, description="Include the chosen query plan in the response")
+
+
+class QueryPlan(BaseModel):
+    """Model describing how a query was executed."""
+    access_path: str = Field(description="Index driving the query, or 'full_scan'")
+    estimated_rows: int = Field(description="Rows the access path was expected to produce")
+    rows_scanned: int = Field(description="Rows actually read from the access path")
+    residual_filters: List[str] = Field(description="Predicates evaluated on each scanned row")
+    candidates: Dict[str, int] = Field(description="Estimated rows for every considered access path")
+
+
+class QueryGroup(BaseModel):
+    """Model for one group of an aggregated query."""
+    key: str
+    total_amount: float
+    expense_count: int
+
+
+class QueryResult(BaseModel):
+    """Model for the result of an expense query."""
+    expenses: Optional[List[Expense]] = None
+    groups: Optional[List[QueryGroup]] = None
+    plan: Optional[QueryPlan] = None
+
+
+class PivotCell(BaseModel):
+    """Model for one category cell of a pivot table."""
+    total_amount: float
+    expense_count: int
+
+
+class PivotTable(BaseModel):
+    """Model for a category by time crosstab."""
+    by: Literal["year", "month", "day", "weekday"]
+    start_date: date_type
+    end_date: date_type
+    cells: Dict[str, Dict[str, PivotCell]] = Field(description="Time bucket -> category -> cell")
+
+
+class BudgetCreate(BaseModel):
+    """Model for setting a monthly budget on a category."""
+    monthly_limit: float = Field(gt=0, description="Monthly spending limit")
+    thresholds: List[float] = Field(
+        default_factory=lambda: [0.8, 1.0],
+        description="Fractions of the limit that raise an alert when crossed"
+    )
+
+
+class Budget(BaseModel):
+    """Model for a monthly budget on a category."""
+    category: ExpenseCategory
+    monthly_limit: float = Field(gt=0, description="Monthly spending limit")
+    thresholds: List[float] = Field(description="Fractions of the limit that raise an alert when crossed")
+
+
+class BudgetStatus(BaseModel):
+    """Model for spend against a budget in one month."""
+    category: ExpenseCategory
+    month: str
+    monthly_limit: float
+    spent: float
+    remaining: float
+    percent_used: float
+    crossed_thresholds: List[float]
+
+
+class BudgetAlert(BaseModel):
+    """Model for a budget threshold crossing."""
+    seq: int = Field(description="Monotonically increasing sequence number")
+    category: ExpenseCategory
+    month: str
+    threshold: float
+    monthly_limit: float
+    spent: float
+    timestamp: datetime = Field(default_factory=datetime.now, description="Time the threshold was crossed")
+
+
+class BudgetAlertFeed(BaseModel):
+    """Model for a batch of budget alerts since a given sequence number."""
+    epoch: str = Field(description="Identifies the database instance; sequence numbers restart when it changes")
+    since: int
+    last_seq: int
+    reset: bool = Field(
+        default=False,
+        description="The requested alerts are no longer retained; clients should resume from last_seq"
+    )
+    alerts: List[BudgetAlert]
@@ -0,0 +1,246 @@
+import operator
+from collections import defaultdict
+from datetime import date
+from heapq import nlargest, nsmallest
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.metrics import store_index_lookups, store_rows_scanned
+from app.models import Expense, ExpenseQuery, QueryFilter, QueryGroup, QueryPlan, QueryResult
+from app.utils import parse_date
+
+
+# Operators that can be answered by a range lookup on a sorted index
+RANGE_OPS = {"eq", "gt", "gte", "lt", "lte", "between"}
+
+COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+GROUP_KEYS = {
+    "category": lambda exp: exp.category,
+    "date": lambda exp: exp.date.isoformat(),
+    "month": lambda exp: exp.date.strftime("%Y-%m"),
+}
+
+
+def _coerce(field: str, value: Any) -> Any:
+    """Convert a JSON operand to the Python type of the field."""
+    if field == "date":
+        return value if isinstance(value, date) else parse_date(str(value))
+    if field == "amount":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid amount: {value}")
+    return str(value)
+
+
+def _operands(query_filter: QueryFilter) -> Any:
+    """Validate and coerce the operand of a filter."""
+    if query_filter.op in ("between", "in"):
+        if not isinstance(query_filter.value, list):
+            raise ValueError(f"'{query_filter.op}' on {query_filter.field} expects a list")
+        if query_filter.op == "between" and len(query_filter.value) != 2:
+            raise ValueError(f"'between' on {query_filter.field} expects exactly two values")
+        return [_coerce(query_filter.field, value) for value in query_filter.value]
+    if query_filter.op == "contains":
+        if query_filter.field not in ("category", "description"):
+            raise ValueError(f"'contains' is not supported on {query_filter.field}")
+        return str(query_filter.value).lower()
+    return _coerce(query_filter.field, query_filter.value)
+
+
+def compile_filter(query_filter: QueryFilter) -> Callable[[Expense], bool]:
+    """Compile a filter into a predicate over expenses."""
+    field, op = query_filter.field, query_filter.op
+    operand = _operands(query_filter)
+
+    if op == "between":
+        low, high = operand
+        test = lambda value: low <= value <= high
+    elif op == "in":
+        values = set(operand)
+        test = lambda value: value in values
+    elif op == "contains":
+        test = lambda value: operand in value.lower()
+    else:
+        compare = COMPARISONS[op]
+        test = lambda value: compare(value, operand)
+
+    def predicate(expense: Expense) -> bool:
+        value = getattr(expense, field)
+        return value is not None and test(value)
+    return predicate
+
+
+def describe_filter(query_filter: QueryFilter) -> str:
+    """Human-readable form of a filter for query plans."""
+    return f"{query_filter.field} {query_filter.op} {query_filter.value!r}"
+
+
+def _range_bounds(filters: Iterable[QueryFilter]) -> Tuple[Optional[Any], bool, Optional[Any], bool]:
+    """Combine range filters on one field into the tightest (low, low_inclusive, high, high_inclusive)."""
+    low, low_inclusive, high, high_inclusive = None, True, None, True
+
+    def raise_low(value, inclusive):
+        nonlocal low, low_inclusive
+        if low is None or value > low or (value == low and not inclusive):
+            low, low_inclusive = value, inclusive
+
+    def lower_high(value, inclusive):
+        nonlocal high, high_inclusive
+        if high is None or value < high or (value == high and not inclusive):
+            high, high_inclusive = value, inclusive
+
+    for query_filter in filters:
+        operand = _operands(query_filter)
+        if query_filter.op in ("eq", "gte", "gt"):
+            raise_low(operand, query_filter.op != "gt")
+        if query_filter.op in ("eq", "lte", "lt"):
+            lower_high(operand, query_filter.op != "lt")
+        if query_filter.op == "between":
+            raise_low(operand[0], True)
+            lower_high(operand[1], True)
+    return low, low_inclusive, high, high_inclusive
+
+
+class AccessPath:
+    """A way of producing candidate expense IDs, with its cost estimate."""
+
+    def __init__(self, name: str, estimated_rows: int, covered: List[QueryFilter],
+                 lookup: Callable[[bool], Iterator[str]], order_field: Optional[str] = None):
+        self.name = name
+        self.estimated_rows = estimated_rows
+        self.covered = covered
+        # Called with `descending`; only ordered paths honour it
+        self.lookup = lookup
+        self.order_field = order_field
+
+
+def candidate_paths(db, filters: List[QueryFilter]) -> List[AccessPath]:
+    """Enumerate the access paths usable for a query, estimating rows from index statistics."""
+    paths = [AccessPath(
+        "full_scan", len(db.expenses), [], lambda descending: iter(list(db.expenses))
+    )]
+
+    category_filters = [f for f in filters if f.field == "category" and f.op in ("eq", "in")]
+    if category_filters:
+        keys = None
+        for query_filter in category_filters:
+            operand = _operands(query_filter)
+            values = operand if query_filter.op == "in" else [operand]
+            # Keep the keys in request order so results do not depend on hash seeds
+            keys = list(dict.fromkeys(values)) if keys is None else [key for key in keys if key in values]
+        paths.append(AccessPath(
+            "category_index",
+            db.category_index.count(keys),
+            category_filters,
+            lambda descending, keys=keys: db.category_index.lookup(keys)
+        ))
+
+    for field, index in (("date", db.date_index), ("amount", db.amount_index)):
+        range_filters = [f for f in filters if f.field == field and f.op in RANGE_OPS]
+        low, low_inclusive, high, high_inclusive = _range_bounds(range_filters)
+        bounds = {"low": low, "high": high, "low_inclusive": low_inclusive, "high_inclusive": high_inclusive}
+        paths.append(AccessPath(
+            f"{field}_index",
+            index.count(**bounds),
+            range_filters,
+            lambda descending, index=index, bounds=bounds: index.lookup(descending=descending, **bounds),
+            order_field=field
+        ))
+    return paths
+
+
+def choose_path(paths: List[AccessPath], query: ExpenseQuery) -> AccessPath:
+    """Pick the access path producing the fewest rows.
+
+    On a tie, a sorted index on the requested order wins because it avoids the
+    sort and lets a limit stop the scan early; otherwise a full scan beats an
+    index that would produce just as many rows.
+    """
+    order_field = query.order_by.lstrip("-") if query.order_by and not query.group_by else None
+
+    def cost(path: AccessPath) -> Tuple[int, int]:
+        if order_field and path.order_field == order_field:
+            return path.estimated_rows, 0
+        return path.estimated_rows, 1 if path.name == "full_scan" else 2
+
+    return min(paths, key=cost)
+
+
+def execute_query(db, query: ExpenseQuery) -> QueryResult:
+    """Plan and execute a query against an InMemoryDatabase."""
+    paths = candidate_paths(db, query.filters)
+    path = choose_path(paths, query)
+    covered = {id(query_filter) for query_filter in path.covered}
+    residual = [query_filter for query_filter in query.filters if id(query_filter) not in covered]
+    predicates = [compile_filter(query_filter) for query_filter in residual]
+
+    descending = bool(query.order_by and query.order_by.startswith("-"))
+    order_field = query.order_by.lstrip("-") if query.order_by else None
+    ordered = not query.group_by and order_field is not None and path.order_field == order_field
+
+    scanned = 0
+
+    def scan() -> Iterator[Expense]:
+        nonlocal scanned
+        for expense_id in path.lookup(descending and ordered):
+            scanned += 1
+            yield db.expenses[expense_id]
+
+    # Lazy pipeline: access path -> residual predicates -> order/limit or grouping
+    rows: Iterator[Expense] = scan()
+    for predicate in predicates:
+        rows = filter(predicate, rows)
+
+    if path.name != "full_scan":
+        store_index_lookups.inc(path.name)
+
+    if query.group_by:
+        result = QueryResult(groups=_group(rows, query))
+    else:
+        if order_field and not ordered:
+            key = lambda exp: getattr(exp, order_field)
+            if query.limit:
+                select = nlargest if descending else nsmallest
+                rows = iter(select(query.limit, rows, key=key))
+            else:
+                rows = iter(sorted(rows, key=key, reverse=descending))
+        result = QueryResult(expenses=list(islice(rows, query.limit)))
+
+    store_rows_scanned.inc("query", amount=scanned)
+    if query.explain:
+        result.plan = QueryPlan(
+            access_path=path.name,
+            estimated_rows=path.estimated_rows,
+            rows_scanned=scanned,
+            residual_filters=[describe_filter(query_filter) for query_filter in residual],
+            candidates={candidate.name: candidate.estimated_rows for candidate in paths}
+        )
+    return result
+
+
+def _group(rows: Iterable[Expense], query: ExpenseQuery) -> List[QueryGroup]:
+    """Aggregate rows into groups, ordered by key or by total amount."""
+    key_of = GROUP_KEYS[query.group_by]
+    totals: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for expense in rows:
+        key = key_of(expense)
+        totals[key] += expense.amount
+        counts[key] += 1
+
+    groups = [QueryGroup(key=key, total_amount=totals[key], expense_count=counts[key]) for key in totals]
+    descending = bool(query.order_by and query.order_by.startswith("-"))
+    if query.order_by and query.order_by.lstrip("-") == "amount":
+        groups.sort(key=lambda group: group.total_amount, reverse=descending)
+    else:
+        groups.sort(key=lambda group: group.key, reverse=descending)
+    return groups[:query.limit] if query.limit else groups
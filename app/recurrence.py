@@ -0,0 +1,142 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, Optional
+
+from dateutil.relativedelta import relativedelta
+
+from app.models import Expense, RecurrenceFrequency, RecurringExpense
+
+
+# Furthest ahead of today that occurrences may be posted as concrete expenses
+MATERIALIZE_HORIZON = timedelta(days=366)
+
+# Length in days of one period for the fixed-length frequencies
+_PERIOD_DAYS = {
+    RecurrenceFrequency.DAILY: 1,
+    RecurrenceFrequency.WEEKLY: 7,
+}
+
+
+def occurrence_date(rule: RecurringExpense, index: int) -> date:
+    """Get the date of the index-th occurrence (0-based), ignoring end_date and count.
+
+    Monthly and yearly occurrences are offset from the start date rather than
+    from each other, so a rule starting on Jan 31 falls on Feb 28/29 and then
+    on Mar 31 again.
+    """
+    step = index * rule.interval
+    if rule.frequency in _PERIOD_DAYS:
+        return rule.start_date + timedelta(days=step * _PERIOD_DAYS[rule.frequency])
+    if rule.frequency == RecurrenceFrequency.MONTHLY:
+        return rule.start_date + relativedelta(months=step)
+    return rule.start_date + relativedelta(years=step)
+
+
+def _on_or_after(rule: RecurringExpense, index: int, day: date) -> bool:
+    """Whether the index-th occurrence falls on or after `day`, counting dates past date.max."""
+    try:
+        return occurrence_date(rule, index) >= day
+    except (OverflowError, ValueError):
+        return True
+
+
+def first_index_on_or_after(rule: RecurringExpense, day: date) -> int:
+    """Get the index of the first occurrence on or after `day`, in constant time."""
+    if rule.frequency in _PERIOD_DAYS:
+        elapsed = (day - rule.start_date).days
+        period = _PERIOD_DAYS[rule.frequency] * rule.interval
+    elif rule.frequency == RecurrenceFrequency.MONTHLY:
+        elapsed = (day.year - rule.start_date.year) * 12 + day.month - rule.start_date.month
+        period = rule.interval
+    else:
+        elapsed = day.year - rule.start_date.year
+        period = rule.interval
+    index = max(0, -(-elapsed // period))
+
+    # Day-of-month clamping can put the estimate off by one period
+    while index > 0 and _on_or_after(rule, index - 1, day):
+        index -= 1
+    while not _on_or_after(rule, index, day):
+        index += 1
+    return index
+
+
+def first_index_after(rule: RecurringExpense, day: date) -> int:
+    """Get the index of the first occurrence strictly after `day`, even when `day` is date.max."""
+    index = first_index_on_or_after(rule, day)
+    # Occurrence dates strictly increase, so at most one of them falls on `day`
+    try:
+        on_day = occurrence_date(rule, index) == day
+    except (OverflowError, ValueError):
+        on_day = False
+    return index + 1 if on_day else index
+
+
+def last_index(rule: RecurringExpense) -> Optional[int]:
+    """Get the index of the final occurrence, or None if the rule never ends."""
+    last = None
+    if rule.count is not None:
+        last = rule.count - 1
+    if rule.end_date is not None:
+        end_index = first_index_after(rule, rule.end_date) - 1
+        last = end_index if last is None else min(last, end_index)
+    return last
+
+
+def index_range(rule: RecurringExpense, start_date: date, end_date: date) -> range:
+    """Get the indexes of the occurrences falling within [start_date, end_date]."""
+    first = first_index_on_or_after(rule, start_date)
+    stop = first_index_after(rule, end_date)
+    final = last_index(rule)
+    if final is not None:
+        stop = min(stop, final + 1)
+    return range(first, max(first, stop))
+
+
+def pending_start(rule: RecurringExpense, start_date: date) -> date:
+    """Get the first date in a range whose occurrences have not been posted as expenses."""
+    if rule.materialized_through and rule.materialized_through >= start_date:
+        return rule.materialized_through + timedelta(days=1)
+    return start_date
+
+
+def count_occurrences(rule: RecurringExpense, start_date: date, end_date: date) -> int:
+    """Count the not yet materialized occurrences within a range without expanding them."""
+    return len(index_range(rule, pending_start(rule, start_date), end_date))
+
+
+def iter_occurrences(rule: RecurringExpense, start_date: date, end_date: date) -> Iterator[date]:
+    """Lazily yield the dates of the occurrences within [start_date, end_date]."""
+    for index in index_range(rule, start_date, end_date):
+        yield occurrence_date(rule, index)
+
+
+def to_expense(rule: RecurringExpense, day: date) -> Expense:
+    """Build a concrete expense for a single occurrence of a rule."""
+    return Expense(
+        amount=rule.amount,
+        category=rule.category,
+        description=rule.description,
+        date=day
+    )
+
+
+def monthly_totals(rules: Iterable[RecurringExpense], start_date: date, end_date: date) -> Dict[str, float]:
+    """Total the not yet materialized occurrences per month, one count per rule and month."""
+    rules = list(rules)
+    totals = defaultdict(float)
+    month_start = start_date.replace(day=1)
+    while month_start <= end_date:
+        month_end = month_start.replace(day=monthrange(month_start.year, month_start.month)[1])
+        window_start = max(month_start, start_date)
+        window_end = min(month_end, end_date)
+        for rule in rules:
+            occurrences = count_occurrences(rule, window_start, window_end)
+            if occurrences:
+                totals[month_start.strftime("%Y-%m")] += rule.amount * occurrences
+        # Stop before stepping past end_date, which may be date.max
+        if month_end >= end_date:
+            break
+        month_start = month_end + timedelta(days=1)
+    return dict(totals)
@@ -1,5 +1,4 @@
 from datetime import date, datetime, timedelta
-from functools import reduce
 from typing import Dict, List, Tuple
 from collections import defaultdict
 
@@ -0,0 +1,81 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import date, datetime
+
+from benchmarks.generator import DEFAULT_VOCABULARY, generate_ledger
+
+
+SUITES = ("database", "utils", "http", "startup")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the expense tracker benchmark suite.")
+    parser.add_argument("--size", type=int, default=10000, help="Number of synthetic expenses")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic ledger")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for category popularity")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2024, 1, 1),
+                        help="First date of the synthetic ledger (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=365, help="Number of days the ledger spans")
+    parser.add_argument("--vocabulary", type=lambda s: s.split(","), default=list(DEFAULT_VOCABULARY),
+                        help="Comma-separated description words")
+    parser.add_argument("--suites", type=lambda s: s.split(","), default=list(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route in the HTTP suite")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients in the HTTP suite")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="Fresh interpreter launches per target in the startup suite")
+    parser.add_argument("--output", default="-", help="Path of the JSON results file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    expenses = generate_ledger(
+        args.size,
+        seed=args.seed,
+        category_skew=args.skew,
+        start_date=args.start_date,
+        days=args.days,
+        vocabulary=args.vocabulary,
+    )
+
+    results = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "size": args.size,
+            "seed": args.seed,
+            "skew": args.skew,
+            "start_date": args.start_date.isoformat(),
+            "days": args.days,
+        },
+    }
+    # Imported lazily so that a run of one suite does not pay for the others
+    if "database" in args.suites:
+        from benchmarks.micro import run_database_benchmarks
+        results["database"] = run_database_benchmarks(expenses, repeat=args.repeat)
+    if "utils" in args.suites:
+        from benchmarks.micro import run_utils_benchmarks
+        results["utils"] = run_utils_benchmarks(expenses, repeat=args.repeat)
+    if "http" in args.suites:
+        from benchmarks.load import run_http_benchmarks
+        results["http"] = run_http_benchmarks(expenses, requests=args.requests, concurrency=args.concurrency)
+    if "startup" in args.suites:
+        from benchmarks.startup import run_startup_benchmarks
+        results["startup"] = run_startup_benchmarks(runs=args.startup_runs)
+
+    output = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
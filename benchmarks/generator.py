@@ -0,0 +1,68 @@
+import random
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from app.models import Expense, ExpenseCategory
+
+
+# Default words used to build synthetic expense descriptions
+DEFAULT_VOCABULARY = (
+    "lunch", "dinner", "coffee", "groceries", "uber", "taxi", "fuel", "bus", "train",
+    "electricity", "water", "internet", "phone", "clothes", "shoes", "gift", "loan",
+    "movie", "concert", "pharmacy", "doctor", "books", "course", "subscription", "rent",
+)
+
+# Typical amount (median of the log-normal distribution) per category
+CATEGORY_MEDIANS = {
+    ExpenseCategory.FOOD.value: 20.0,
+    ExpenseCategory.TRANSPORTATION.value: 15.0,
+    ExpenseCategory.UTILITIES.value: 80.0,
+    ExpenseCategory.SHOPPING.value: 60.0,
+    ExpenseCategory.EMI.value: 900.0,
+    ExpenseCategory.ENTERTAINMENT.value: 30.0,
+    ExpenseCategory.HEALTHCARE.value: 50.0,
+    ExpenseCategory.EDUCATION.value: 120.0,
+    ExpenseCategory.OTHER.value: 25.0,
+}
+
+
+def category_weights(categories: Sequence[str], skew: float) -> List[float]:
+    """Zipf-like weights: the i-th category is drawn with probability ~ 1 / (i + 1) ** skew."""
+    return [1.0 / (rank + 1) ** skew for rank in range(len(categories))]
+
+
+def generate_ledger(
+    size: int,
+    seed: int = 0,
+    category_skew: float = 1.0,
+    start_date: date = date(2024, 1, 1),
+    days: int = 365,
+    vocabulary: Sequence[str] = DEFAULT_VOCABULARY,
+    categories: Optional[Sequence[str]] = None,
+) -> List[Expense]:
+    """Generate a reproducible synthetic ledger of expenses.
+
+    The same arguments always produce the same expenses, including IDs and
+    creation timestamps, so benchmark runs are comparable.
+    """
+    rng = random.Random(seed)
+    categories = list(categories or [category.value for category in ExpenseCategory])
+    weights = category_weights(categories, category_skew)
+
+    drawn_categories = rng.choices(categories, weights=weights, k=size)
+    expenses = []
+    for category in drawn_categories:
+        expense_date = start_date + timedelta(days=rng.randrange(days))
+        median = CATEGORY_MEDIANS.get(category, 25.0)
+        amount = round(max(0.01, rng.lognormvariate(0.0, 0.75) * median), 2)
+        description = " ".join(rng.choices(vocabulary, k=rng.randint(1, 3)))
+        expenses.append(Expense(
+            id=str(UUID(int=rng.getrandbits(128), version=4)),
+            amount=amount,
+            category=category,
+            description=description,
+            date=expense_date,
+            created_at=datetime.combine(expense_date, time(rng.randrange(24), rng.randrange(60)))
+        ))
+    return expenses
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import math
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from app.models import Expense
+
+
+async def call_asgi(app, method: str, path: str, query: Optional[Dict[str, str]] = None,
+                    body: Optional[dict] = None) -> Tuple[int, bytes]:
+    """Issue a single in-process HTTP request against an ASGI app."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"benchmark")]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(payload)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    request_sent = False
+    status_code = 0
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # The request has been fully read; block until the app gives up on us
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status_code, b"".join(chunks)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_route(app, name: str, method: str, path: str, requests: int, concurrency: int,
+                    query: Optional[Dict[str, str]] = None, body_factory=None) -> Dict:
+    """Fire `requests` calls at one route with bounded concurrency and summarize latency."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            body = body_factory(i) if body_factory else None
+            start = time.perf_counter()
+            status_code, _ = await call_asgi(app, method, path, query, body)
+            latencies.append(time.perf_counter() - start)
+            if status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "route": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+
+def run_http_benchmarks(expenses: List[Expense], requests: int = 200, concurrency: int = 8) -> Dict[str, Dict]:
+    """Load the API's database with `expenses` and benchmark the list, summary and create routes."""
+    from app.database import database
+    from app.main import app
+
+    for expense in expenses:
+        database.create_expense(expense.model_copy())
+
+    dates = sorted(expense.date for expense in expenses)
+    period = {"start_date": dates[0].isoformat(), "end_date": dates[-1].isoformat()}
+    category = expenses[0].category
+
+    def new_expense(i: int) -> dict:
+        return {"amount": 10 + i % 50, "category": category, "description": "load test",
+                "date": dates[i % len(dates)].isoformat()}
+
+    async def run_all() -> Dict[str, Dict]:
+        results = {}
+        for name, method, path, query, body_factory in [
+            ("list", "GET", "/expenses/", None, None),
+            ("summary_categories", "GET", "/expenses/summary/categories", None, None),
+            ("summary_period", "GET", "/expenses/summary/period", period, None),
+            ("create", "POST", "/expenses/", None, new_expense),
+        ]:
+            results[name] = await run_route(app, name, method, path, requests, concurrency, query, body_factory)
+        return results
+
+    return asyncio.run(run_all())
@@ -0,0 +1,110 @@
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.database import InMemoryDatabase
+from app.models import Expense, ExpenseQuery, QueryFilter
+from app.utils import (
+    calculate_category_percentages,
+    calculate_monthly_trend,
+    export_expenses_to_dict,
+    get_date_range,
+    parse_date,
+)
+
+
+def measure(func: Callable[[], object], repeat: int = 5, number: int = 100,
+            setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Time `func` in `repeat` rounds of `number` calls and report per-call seconds."""
+    rounds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(rounds),
+        "median": statistics.median(rounds),
+        "max": max(rounds),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def build_database(expenses: List[Expense]) -> InMemoryDatabase:
+    """Create a fresh database loaded with the given expenses."""
+    db = InMemoryDatabase()
+    for expense in expenses:
+        db.create_expense(expense)
+    return db
+
+
+def run_database_benchmarks(expenses: List[Expense], repeat: int = 5, number: int = 20) -> Dict[str, Dict]:
+    """Benchmark every public InMemoryDatabase operation against the given ledger."""
+    db = build_database(expenses)
+    ids = [expense.id for expense in expenses]
+    dates = sorted(expense.date for expense in expenses)
+    # A range covering roughly the middle tenth of the ledger
+    start, end = dates[len(dates) * 45 // 100], dates[len(dates) * 55 // 100]
+    category = expenses[0].category
+    probe = ids[len(ids) // 2]
+    results = {}
+
+    results["get_all_expenses"] = measure(db.get_all_expenses, repeat, number)
+    results["get_expense"] = measure(lambda: db.get_expense(probe), repeat, number * 100)
+    results["get_expense_summary"] = measure(db.get_expense_summary, repeat, number)
+    results["get_period_summary"] = measure(lambda: db.get_period_summary(start, end), repeat, number)
+    results["filter_expenses_by_category"] = measure(
+        lambda: db.filter_expenses_by_category(category), repeat, number)
+    results["filter_expenses_by_date_range"] = measure(
+        lambda: db.filter_expenses_by_date_range(start, end), repeat, number)
+    results["filter_expenses_by_amount_range"] = measure(
+        lambda: db.filter_expenses_by_amount_range(10.0, 100.0), repeat, number)
+    results["get_pivot"] = measure(lambda: db.get_pivot("month", dates[0], dates[-1]), repeat, number)
+    results["get_monthly_trend"] = measure(lambda: db.get_monthly_trend(dates[0], dates[-1]), repeat, number)
+    selective_query = ExpenseQuery(filters=[
+        QueryFilter(field="category", op="eq", value=category),
+        QueryFilter(field="date", op="between", value=[start, end]),
+    ])
+    results["query"] = measure(lambda: db.query(selective_query), repeat, number)
+    results["get_changes"] = measure(lambda: db.get_changes(db.last_seq - 100), repeat, number * 100)
+
+    # Write benchmarks: cycle through existing rows so the table size stays constant
+    cursor = iter(range(10 ** 12))
+
+    def update_one():
+        expense_id = ids[next(cursor) % len(ids)]
+        db.update_expense(expense_id, db.expenses[expense_id])
+
+    results["update_expense"] = measure(update_one, repeat, number * 100)
+
+    def delete_and_recreate():
+        expense_id = ids[next(cursor) % len(ids)]
+        expense = db.expenses[expense_id]
+        db.delete_expense(expense_id)
+        db.create_expense(expense)
+
+    results["delete_expense+create_expense"] = measure(delete_and_recreate, repeat, number * 100)
+
+    def create_new():
+        db.create_expense(Expense(amount=12.5, category=category, description="bench", date=start))
+
+    results["create_expense"] = measure(create_new, repeat, number * 100)
+    return results
+
+
+def run_utils_benchmarks(expenses: List[Expense], repeat: int = 5, number: int = 20) -> Dict[str, Dict]:
+    """Benchmark every function in app.utils against the given ledger."""
+    results = {}
+    results["parse_date"] = measure(lambda: parse_date("2024-06-15"), repeat, number * 100)
+    periods = ["today", "yesterday", "this_week", "last_week",
+               "this_month", "last_month", "this_year", "last_year"]
+    results["get_date_range"] = measure(
+        lambda: [get_date_range(period) for period in periods], repeat, number * 10)
+    results["calculate_monthly_trend"] = measure(lambda: calculate_monthly_trend(expenses), repeat, number)
+    results["calculate_category_percentages"] = measure(
+        lambda: calculate_category_percentages(expenses), repeat, number)
+    results["export_expenses_to_dict"] = measure(lambda: export_expenses_to_dict(expenses), repeat, number)
+    return results
@@ -0,0 +1,67 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet runs in a fresh interpreter and prints its timings as JSON
+API_SNIPPET = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from benchmarks.load import call_asgi
+asyncio.run(call_asgi(app.main.app, "GET", "/expenses/"))
+served = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_request": served - start}))
+"""
+
+# The test harness import is timed on its own; first_run is the app script's first execution
+STREAMLIT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+AppTest.from_file("frontend/app.py", default_timeout=60).run()
+served = time.perf_counter()
+print(json.dumps({"harness_import": imported - start, "first_run": served - imported}))
+"""
+
+
+def _run_snippet(snippet: str) -> Dict[str, float]:
+    """Run a timing snippet in a fresh interpreter and return its timings plus wall time."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings["process_wall"] = wall
+    return timings
+
+
+def _summarize(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    """Median of each timing across runs."""
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def run_startup_benchmarks(runs: int = 5) -> Dict[str, Dict]:
+    """Measure import time and time-to-first-request for the API, and the Streamlit app's first run."""
+    results = {}
+    for name, snippet in [("api", API_SNIPPET), ("streamlit", STREAMLIT_SNIPPET)]:
+        try:
+            samples = [_run_snippet(snippet) for _ in range(runs)]
+        except subprocess.CalledProcessError as e:
+            results[name] = {"error": e.stderr.strip().splitlines()[-1] if e.stderr.strip() else str(e)}
+            continue
+        results[name] = dict(_summarize(samples), runs=runs)
+    return results
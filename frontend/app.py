@@ -1,11 +1,11 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import altair as alt
 import json
 from datetime import datetime, timedelta, date
 import requests
 
+# pandas, matplotlib and altair are heavy to import, so they are imported
+# where they are first used instead of at the top of the script
+
 # API base URL
 API_URL = "http://localhost:8888"  # Updated to the new port
 
@@ -21,10 +21,38 @@ def format_currency(value):
 
 # Function to fetch data from API
 def fetch_expenses():
+    # Keep a local copy of the expenses and apply only the changes since the last sync
     try:
-        response = requests.get(f"{API_URL}/expenses/", timeout=10)
+        if "expense_cache" not in st.session_state:
+            # Bootstrap from the current list instead of replaying the whole feed
+            response = requests.get(f"{API_URL}/expenses/changes/snapshot", timeout=10)
+            if response.status_code != 200:
+                st.error(f"Error fetching expenses: {response.text}")
+                return []
+            snapshot = response.json()
+            st.session_state.expense_cache = {expense["id"]: expense for expense in snapshot["expenses"]}
+            st.session_state.expense_epoch = snapshot["epoch"]
+            st.session_state.expense_seq = snapshot["last_seq"]
+
+        response = requests.get(
+            f"{API_URL}/expenses/changes",
+            params={"since": st.session_state.expense_seq, "epoch": st.session_state.expense_epoch},
+            timeout=10
+        )
         if response.status_code == 200:
-            return response.json()
+            feed = response.json()
+            if feed["reset"]:
+                # The backend was restarted or compacted the feed; drop the stale cache and bootstrap again
+                del st.session_state.expense_cache
+                return fetch_expenses()
+            cache = st.session_state.expense_cache
+            for change in feed["changes"]:
+                if change["type"] == "delete":
+                    cache.pop(change["expense_id"], None)
+                else:
+                    cache[change["expense_id"]] = change["expense"]
+            st.session_state.expense_seq = feed["last_seq"]
+            return list(cache.values())
         else:
             st.error(f"Error fetching expenses: {response.text}")
             return []
@@ -75,6 +103,28 @@ def fetch_period_summary(period=None, start_date=None, end_date=None):
         st.error(f"Unexpected error: {str(e)}")
         return None
 
+# Function to fetch total spending per month, including scheduled recurring expenses
+def fetch_monthly_trend(start_date=None, end_date=None):
+    params = {}
+    if start_date:
+        params["start_date"] = start_date.strftime("%Y-%m-%d")
+    if end_date:
+        params["end_date"] = end_date.strftime("%Y-%m-%d")
+    
+    try:
+        response = requests.get(f"{API_URL}/expenses/summary/monthly", params=params, timeout=10)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            st.error(f"Error fetching monthly trend: {response.text}")
+            return None
+    except requests.exceptions.ConnectionError:
+        st.error(f"Cannot connect to the backend server at {API_URL}. Please make sure it's running.")
+        return None
+    except Exception as e:
+        st.error(f"Unexpected error: {str(e)}")
+        return None
+
 # Function to add an expense
 def add_expense(expense_data):
     try:
@@ -109,16 +159,23 @@ def delete_expense(expense_id):
         st.error(f"Unexpected error: {str(e)}")
         return False
 
-# Create tabs
-tab1, tab2, tab3 = st.tabs(["📝 Expenses", "📊 Dashboard", "➕ Add Expense"])
+# Select a view; unlike st.tabs, which runs every tab on each rerun, only the
+# selected view runs, so the charting libraries are imported only when shown
+view = st.radio(
+    "View",
+    ["📝 Expenses", "📊 Dashboard", "➕ Add Expense"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
-# Tab 1: Expenses List
-with tab1:
+# View 1: Expenses List
+if view == "📝 Expenses":
     st.subheader("Expense Records")
     
     # Fetch expenses and create DataFrame
     expenses = fetch_expenses()
     if expenses:
+        import pandas as pd
         df = pd.DataFrame(expenses)
         
         # Convert date strings to datetime
@@ -162,8 +219,8 @@ with tab1:
     else:
         st.info("No expenses found. Add some expenses to get started!")
 
-# Tab 2: Dashboard
-with tab2:
+# View 2: Dashboard
+if view == "📊 Dashboard":
     st.subheader("Expense Analytics Dashboard")
     
     # Date range selection
@@ -211,6 +268,7 @@ with tab2:
         st.subheader("Expense Distribution by Category")
         
         if period_summary['category_breakdown']:
+            import pandas as pd
             # Prepare data for chart
             categories_df = pd.DataFrame({
                 "Category": list(period_summary['category_breakdown'].keys()),
@@ -226,6 +284,7 @@ with tab2:
             categories_df["Label"] = categories_df.apply(lambda row: f"{row['Category']}: {format_currency(row['Amount'])} ({row['Percentage']}%)", axis=1)
             
             # Create pie chart
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(figsize=(10, 6))
             ax.pie(categories_df["Amount"], labels=categories_df["Label"], autopct="", startangle=90)
             ax.axis("equal")  # Equal aspect ratio ensures that pie is drawn as a circle
@@ -246,21 +305,22 @@ with tab2:
     else:
         st.warning("Unable to load expense summary. Make sure the API is running.")
     
-    # Fetch all expenses for trend analysis
-    all_expenses = fetch_expenses()
-    if all_expenses:
-        df = pd.DataFrame(all_expenses)
-        df["date"] = pd.to_datetime(df["date"])
+    # Fetch the monthly totals over the full history; like the distribution above,
+    # they include recurring expenses that are not posted yet
+    monthly_trend = fetch_monthly_trend()
+    if monthly_trend:
+        import pandas as pd
         
         # Monthly trend chart
         st.subheader("Monthly Expense Trend")
         
-        # Group by month and sum amounts
-        df["month"] = df["date"].dt.to_period("M")
-        monthly_data = df.groupby("month")["amount"].sum().reset_index()
-        monthly_data["month_str"] = monthly_data["month"].astype(str)
+        monthly_data = pd.DataFrame({
+            "month_str": list(monthly_trend.keys()),
+            "amount": list(monthly_trend.values())
+        })
         
         # Create bar chart
+        import altair as alt
         monthly_chart = alt.Chart(monthly_data).mark_bar().encode(
             x=alt.X("month_str:O", title="Month", sort=None),
             y=alt.Y("amount:Q", title="Total Amount ($)"),
@@ -272,8 +332,8 @@ with tab2:
         
         st.altair_chart(monthly_chart, use_container_width=True)
 
-# Tab 3: Add Expense
-with tab3:
+# View 3: Add Expense
+if view == "➕ Add Expense":
     st.subheader("Add New Expense")
     
     with st.form("add_expense_form"):
@@ -323,6 +383,7 @@ st.sidebar.title("Export Data")
 if st.sidebar.button("Export to CSV"):
     expenses = fetch_expenses()
     if expenses:
+        import pandas as pd
         df = pd.DataFrame(expenses)
         # Convert to CSV
         csv = df.to_csv(index=False)
@@ -0,0 +1,149 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.cube import WEEKDAYS, ExpenseCube
+from app.database import InMemoryDatabase
+from app.models import Expense
+
+
+CATEGORIES = ["Food", "EMI", "Other"]
+
+
+def brute_force_totals(expenses, start_date, end_date, category=None):
+    """Totals per category computed directly from the expenses."""
+    totals = {}
+    for expense in expenses:
+        if start_date <= expense.date <= end_date and category in (None, expense.category):
+            cell = totals.setdefault(expense.category, [0.0, 0])
+            cell[0] += expense.amount
+            cell[1] += 1
+    return totals
+
+
+def brute_force_pivot(expenses, by, start_date, end_date, category=None):
+    """Crosstab computed directly from the expenses."""
+    bucket_of = {
+        "year": lambda day: str(day.year),
+        "month": lambda day: day.strftime("%Y-%m"),
+        "day": lambda day: day.isoformat(),
+        "weekday": lambda day: WEEKDAYS[day.weekday()],
+    }[by]
+    table = {}
+    for expense in expenses:
+        if start_date <= expense.date <= end_date and category in (None, expense.category):
+            cell = table.setdefault(bucket_of(expense.date), {}).setdefault(expense.category, [0.0, 0])
+            cell[0] += expense.amount
+            cell[1] += 1
+    return table
+
+
+def assert_cells_equal(actual, expected):
+    assert set(actual) == set(expected)
+    for key, (amount, count) in expected.items():
+        assert actual[key][0] == pytest.approx(amount)
+        assert actual[key][1] == count
+
+
+def assert_tables_equal(actual, expected):
+    assert set(actual) == set(expected)
+    for bucket in expected:
+        assert_cells_equal(actual[bucket], expected[bucket])
+
+
+@pytest.fixture
+def db():
+    rng = random.Random(3)
+    database = InMemoryDatabase()
+    for _ in range(500):
+        database.create_expense(Expense(
+            amount=round(rng.uniform(1, 100), 2),
+            category=rng.choice(CATEGORIES),
+            description="test",
+            date=date(2023, 11, 1) + timedelta(days=rng.randrange(500))
+        ))
+    ids = list(database.expenses)
+    for expense_id in ids[:100]:
+        database.delete_expense(expense_id)
+    for expense_id in ids[100:200]:
+        expense = database.expenses[expense_id]
+        database.update_expense(expense_id, expense.model_copy(update={
+            "amount": expense.amount * 2,
+            "category": rng.choice(CATEGORIES),
+            "date": expense.date + timedelta(days=rng.randint(-40, 40)),
+        }))
+    return database
+
+
+def test_range_totals_match_brute_force_after_writes(db):
+    rng = random.Random(5)
+    expenses = list(db.expenses.values())
+    for _ in range(300):
+        start = date(2023, 10, 1) + timedelta(days=rng.randrange(600))
+        end = start + timedelta(days=rng.randrange(500))
+        category = rng.choice([None] + CATEGORIES)
+        assert_cells_equal(db.cube.range_totals(start, end, category), brute_force_totals(expenses, start, end, category))
+
+
+def test_whole_years_and_months(db):
+    expenses = list(db.expenses.values())
+    for start, end in [
+        (date(2024, 1, 1), date(2024, 12, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2023, 12, 31), date(2025, 1, 1)),
+        (date(1, 1, 1), date.max),
+    ]:
+        assert_cells_equal(db.cube.range_totals(start, end), brute_force_totals(expenses, start, end))
+
+
+@pytest.mark.parametrize("by", ["year", "month", "day", "weekday"])
+def test_pivot_matches_brute_force_after_writes(db, by):
+    rng = random.Random(by)
+    expenses = list(db.expenses.values())
+    for _ in range(30):
+        start = date(2023, 10, 1) + timedelta(days=rng.randrange(600))
+        end = start + timedelta(days=rng.randrange(500))
+        category = rng.choice([None] + CATEGORIES)
+        table = db.cube.pivot(by, start, end, category)
+        assert_tables_equal(table, brute_force_pivot(expenses, by, start, end, category))
+        if by == "weekday":
+            assert list(table) == [name for name in WEEKDAYS if name in table]
+        else:
+            assert list(table) == sorted(table)
+
+
+def test_delete_removes_empty_cells():
+    cube = ExpenseCube()
+    cube.add("Food", date(2024, 3, 5), 10.0)
+    cube.add("Food", date(2024, 3, 5), 5.0)
+    cube.remove("Food", date(2024, 3, 5), 10.0)
+    assert cube.range_totals(date(2024, 1, 1), date(2024, 12, 31)) == {"Food": [5.0, 1]}
+    cube.remove("Food", date(2024, 3, 5), 5.0)
+    assert cube.years == {} and cube.months == {} and cube.days == {}
+    assert cube.date_span() is None
+
+
+@pytest.mark.parametrize("by", ["year", "month", "day", "weekday"])
+def test_ranges_ending_on_date_max(by):
+    cube = ExpenseCube()
+    expenses = [
+        Expense(amount=5.0, category="Food", date=date.max),
+        Expense(amount=7.0, category="EMI", date=date(9999, 12, 30)),
+        Expense(amount=9.0, category="Food", date=date(9999, 1, 1)),
+        Expense(amount=3.0, category="Food", date=date(1, 1, 1)),
+    ]
+    for expense in expenses:
+        cube.add(expense.category, expense.date, expense.amount)
+    for start in [date(9999, 12, 30), date(9999, 12, 1), date(9999, 1, 1), date(9998, 6, 15), date(1, 1, 1)]:
+        assert_cells_equal(cube.range_totals(start, date.max), brute_force_totals(expenses, start, date.max))
+        assert_tables_equal(cube.pivot(by, start, date.max), brute_force_pivot(expenses, by, start, date.max))
+
+
+def test_database_summaries_at_date_max():
+    database = InMemoryDatabase()
+    database.create_expense(Expense(amount=5.0, category="Food", date=date.max))
+    summary = database.get_period_summary(date(9999, 12, 30), date.max)
+    assert (summary.total_amount, summary.total_expenses) == (5.0, 1)
+    assert database.get_monthly_trend(date(9999, 1, 1), date.max) == {"9999-12": 5.0}
+    assert list(database.get_pivot("day", date(9999, 12, 30), date.max).cells) == ["9999-12-31"]
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from app.indexes import HashIndex, SortedIndex
+
+
+def brute_force_range(entries, low=None, high=None, low_inclusive=True, high_inclusive=True):
+    """IDs of (key, id) entries within the bounds, in (key, id) order."""
+    def inside(key):
+        if low is not None and (key < low or (key == low and not low_inclusive)):
+            return False
+        if high is not None and (key > high or (key == high and not high_inclusive)):
+            return False
+        return True
+    return [expense_id for key, expense_id in sorted(entries) if inside(key)]
+
+
+def test_hash_index_returns_ids_in_insertion_order():
+    index = HashIndex()
+    for expense_id in ["c", "a", "b"]:
+        index.add("Food", expense_id)
+    index.add("EMI", "d")
+    assert list(index.lookup(["Food"])) == ["c", "a", "b"]
+    assert list(index.lookup(["EMI", "Food"])) == ["d", "c", "a", "b"]
+    assert index.count(["Food", "EMI", "Other"]) == 4
+
+
+def test_hash_index_remove_drops_empty_buckets():
+    index = HashIndex()
+    index.add("Food", "a")
+    index.remove("Food", "a")
+    index.remove("Food", "missing")
+    assert index.buckets == {}
+    assert list(index.lookup(["Food"])) == []
+
+
+def test_sorted_index_duplicate_keys():
+    index = SortedIndex()
+    for expense_id in ["b", "d", "a", "c"]:
+        index.add(5, expense_id)
+    index.add(3, "z")
+    index.add(7, "y")
+    assert list(index.lookup(5, 5)) == ["a", "b", "c", "d"]
+    assert index.count(5, 5) == 4
+    assert list(index.lookup(5, None, low_inclusive=False)) == ["y"]
+    assert list(index.lookup(None, 5, high_inclusive=False)) == ["z"]
+    assert list(index.lookup(5, 5, descending=True)) == ["d", "c", "b", "a"]
+
+
+def test_sorted_index_remove_deletes_the_exact_entry():
+    index = SortedIndex()
+    for expense_id in ["a", "b", "c"]:
+        index.add(5, expense_id)
+    index.remove(5, "b")
+    index.remove(5, "missing")
+    index.remove(6, "a")
+    assert list(index.lookup()) == ["a", "c"]
+    assert len(index) == 2
+
+
+def test_sorted_index_empty_and_inverted_ranges():
+    index = SortedIndex()
+    assert list(index.lookup(1, 2)) == []
+    index.add(5, "a")
+    assert index.count(6, 4) == 0
+    assert list(index.lookup(5, 5, low_inclusive=False)) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sorted_index_matches_brute_force_after_adds_and_removes(seed):
+    rng = random.Random(seed)
+    index = SortedIndex()
+    entries = set()
+    for step in range(600):
+        if entries and rng.random() < 0.3:
+            key, expense_id = rng.choice(sorted(entries))
+            index.remove(key, expense_id)
+            entries.discard((key, expense_id))
+        else:
+            # Few distinct keys so that most lookups bisect through duplicates
+            entry = (rng.randint(0, 20), f"id-{step}")
+            index.add(*entry)
+            entries.add(entry)
+
+        low = rng.choice([None, rng.randint(-1, 21)])
+        high = rng.choice([None, rng.randint(-1, 21)])
+        bounds = dict(low=low, high=high, low_inclusive=rng.random() < 0.5, high_inclusive=rng.random() < 0.5)
+        expected = brute_force_range(entries, **bounds)
+        assert list(index.lookup(**bounds)) == expected
+        assert list(index.lookup(descending=True, **bounds)) == expected[::-1]
+        assert index.count(**bounds) == len(expected)
+    assert index.entries == sorted(entries)
@@ -0,0 +1,149 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.database import InMemoryDatabase
+from app.models import Expense, ExpenseQuery, QueryFilter
+from app.query import _range_bounds
+
+
+CATEGORIES = ["Food", "EMI", "Other", "Utilities"]
+
+
+def brute_force_match(expense: Expense, query_filter: dict) -> bool:
+    """Evaluate one filter directly on an expense."""
+    field, op, value = query_filter["field"], query_filter["op"], query_filter["value"]
+    actual = getattr(expense, field)
+    if field == "date":
+        value = [date.fromisoformat(v) for v in value] if isinstance(value, list) else date.fromisoformat(value)
+    if op == "eq":
+        return actual == value
+    if op == "ne":
+        return actual != value
+    if op == "gt":
+        return actual > value
+    if op == "gte":
+        return actual >= value
+    if op == "lt":
+        return actual < value
+    if op == "lte":
+        return actual <= value
+    if op == "between":
+        return value[0] <= actual <= value[1]
+    if op == "in":
+        return actual in value
+    raise AssertionError(op)
+
+
+def random_value(rng: random.Random, field: str):
+    if field == "category":
+        return rng.choice(CATEGORIES)
+    if field == "date":
+        return (date(2024, 1, 1) + timedelta(days=rng.randrange(120))).isoformat()
+    return float(rng.randint(1, 40))
+
+
+def random_filter(rng: random.Random) -> dict:
+    field = rng.choice(["category", "date", "amount"])
+    op = rng.choice(["eq", "ne", "gt", "gte", "lt", "lte", "between", "in"])
+    value = random_value(rng, field)
+    if op == "between":
+        value = sorted([value, random_value(rng, field)])
+    elif op == "in":
+        value = [value, random_value(rng, field)]
+    return {"field": field, "op": op, "value": value}
+
+
+@pytest.fixture
+def db():
+    rng = random.Random(7)
+    database = InMemoryDatabase()
+    for _ in range(400):
+        # Integer amounts and a short date span give many duplicate keys
+        database.create_expense(Expense(
+            amount=float(rng.randint(1, 40)),
+            category=rng.choice(CATEGORIES),
+            description="test",
+            date=date(2024, 1, 1) + timedelta(days=rng.randrange(120))
+        ))
+    ids = list(database.expenses)
+    for expense_id in ids[:50]:
+        database.delete_expense(expense_id)
+    for expense_id in ids[50:100]:
+        expense = database.expenses[expense_id]
+        database.update_expense(expense_id, expense.model_copy(update={"amount": expense.amount + 1, "category": "Food"}))
+    return database
+
+
+def test_range_bounds_keep_the_tightest_limits():
+    filters = [
+        QueryFilter(field="amount", op="gte", value=5),
+        QueryFilter(field="amount", op="gt", value=5),
+        QueryFilter(field="amount", op="between", value=[1, 20]),
+        QueryFilter(field="amount", op="lt", value=20),
+    ]
+    assert _range_bounds(filters) == (5.0, False, 20.0, False)
+    assert _range_bounds([QueryFilter(field="amount", op="eq", value=3)]) == (3.0, True, 3.0, True)
+    assert _range_bounds([]) == (None, True, None, True)
+
+
+def test_planner_picks_the_most_selective_index(db):
+    result = db.query(ExpenseQuery(filters=[
+        QueryFilter(field="date", op="eq", value="2024-01-05"),
+        QueryFilter(field="amount", op="gte", value=1),
+    ], explain=True))
+    assert result.plan.access_path == "date_index"
+    assert result.plan.rows_scanned == result.plan.estimated_rows
+    assert result.plan.residual_filters == ["amount gte 1"]
+
+
+def test_random_queries_match_brute_force(db):
+    rng = random.Random(11)
+    for _ in range(400):
+        filters = [random_filter(rng) for _ in range(rng.randint(0, 3))]
+        order_by = rng.choice([None, "date", "-date", "amount", "-amount"])
+        limit = rng.choice([None, 5])
+        result = db.query(ExpenseQuery(filters=filters, order_by=order_by, limit=limit))
+
+        matches = [e for e in db.expenses.values() if all(brute_force_match(e, f) for f in filters)]
+        if order_by:
+            field = order_by.lstrip("-")
+            matches.sort(key=lambda e: getattr(e, field), reverse=order_by.startswith("-"))
+            # Ties may come back in any order, so compare the sort keys
+            expected_keys = [getattr(e, field) for e in matches[:limit]]
+            assert [getattr(e, field) for e in result.expenses] == expected_keys, (filters, order_by)
+        if limit:
+            assert len(result.expenses) == min(limit, len(matches))
+            assert {e.id for e in result.expenses} <= {e.id for e in matches}
+        else:
+            assert sorted(e.id for e in result.expenses) == sorted(e.id for e in matches), filters
+
+
+def test_random_group_by_matches_brute_force(db):
+    rng = random.Random(13)
+    for _ in range(100):
+        filters = [random_filter(rng) for _ in range(rng.randint(0, 2))]
+        group_by = rng.choice(["category", "date", "month"])
+        result = db.query(ExpenseQuery(filters=filters, group_by=group_by))
+
+        expected = {}
+        for expense in db.expenses.values():
+            if all(brute_force_match(expense, f) for f in filters):
+                key = {
+                    "category": expense.category,
+                    "date": expense.date.isoformat(),
+                    "month": expense.date.strftime("%Y-%m"),
+                }[group_by]
+                total, count = expected.get(key, (0.0, 0))
+                expected[key] = (total + expense.amount, count + 1)
+        assert [group.key for group in result.groups] == sorted(expected)
+        for group in result.groups:
+            assert (group.total_amount, group.expense_count) == pytest.approx(expected[group.key])
+
+
+def test_invalid_operands_raise_value_error(db):
+    with pytest.raises(ValueError):
+        db.query(ExpenseQuery(filters=[QueryFilter(field="amount", op="between", value=5)]))
+    with pytest.raises(ValueError):
+        db.query(ExpenseQuery(filters=[QueryFilter(field="date", op="gte", value="not a date")]))
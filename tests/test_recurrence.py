@@ -0,0 +1,151 @@
+import random
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import List, Optional
+
+import pytest
+
+from app import recurrence
+from app.models import RecurrenceFrequency, RecurringExpense
+
+
+def make_rule(frequency: RecurrenceFrequency, start_date: date, interval: int = 1,
+              end_date: Optional[date] = None, count: Optional[int] = None,
+              materialized_through: Optional[date] = None) -> RecurringExpense:
+    return RecurringExpense(
+        amount=10.0,
+        category="Utilities",
+        frequency=frequency,
+        interval=interval,
+        start_date=start_date,
+        end_date=end_date,
+        count=count,
+        materialized_through=materialized_through
+    )
+
+
+def brute_force_dates(rule: RecurringExpense, through: date = date.max) -> List[date]:
+    """Expand a rule occurrence by occurrence from its definition, up to `through`."""
+    dates = []
+    k = 0
+    while rule.count is None or k < rule.count:
+        step = k * rule.interval
+        if rule.frequency in (RecurrenceFrequency.DAILY, RecurrenceFrequency.WEEKLY):
+            days = step * (7 if rule.frequency == RecurrenceFrequency.WEEKLY else 1)
+            if days > (date.max - rule.start_date).days:
+                break
+            day = rule.start_date + timedelta(days=days)
+        else:
+            months = step * (12 if rule.frequency == RecurrenceFrequency.YEARLY else 1)
+            year, month = divmod(rule.start_date.year * 12 + rule.start_date.month - 1 + months, 12)
+            if year > date.max.year:
+                break
+            # Clamp to the last day of shorter months
+            day = date(year, month + 1, min(rule.start_date.day, monthrange(year, month + 1)[1]))
+        if day > through or (rule.end_date is not None and day > rule.end_date):
+            break
+        dates.append(day)
+        k += 1
+    return dates
+
+
+def random_rule(rng: random.Random, start_date: date) -> RecurringExpense:
+    end_date = None
+    if rng.random() < 0.3 and start_date < date(9998, 1, 1):
+        end_date = start_date + timedelta(days=rng.randint(0, 400))
+    return make_rule(
+        rng.choice(list(RecurrenceFrequency)),
+        start_date,
+        interval=rng.randint(1, 3),
+        end_date=end_date,
+        count=rng.randint(1, 20) if rng.random() < 0.3 else None
+    )
+
+
+def test_monthly_rule_on_the_31st_clamps_to_month_end():
+    rule = make_rule(RecurrenceFrequency.MONTHLY, date(2024, 1, 31))
+    assert list(recurrence.iter_occurrences(rule, date(2024, 1, 1), date(2024, 6, 30))) == [
+        date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31),
+        date(2024, 4, 30), date(2024, 5, 31), date(2024, 6, 30),
+    ]
+
+
+def test_monthly_rule_on_the_31st_with_interval():
+    rule = make_rule(RecurrenceFrequency.MONTHLY, date(2023, 1, 31), interval=3)
+    assert list(recurrence.iter_occurrences(rule, date(2023, 1, 1), date(2024, 3, 1))) == [
+        date(2023, 1, 31), date(2023, 4, 30), date(2023, 7, 31), date(2023, 10, 31), date(2024, 1, 31),
+    ]
+
+
+def test_yearly_rule_on_leap_day():
+    rule = make_rule(RecurrenceFrequency.YEARLY, date(2024, 2, 29))
+    assert list(recurrence.iter_occurrences(rule, date(2024, 1, 1), date(2028, 12, 31))) == [
+        date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29),
+    ]
+
+
+@pytest.mark.parametrize("count, end_date, expected", [
+    (3, date(2024, 12, 31), 3),   # count ends the rule first
+    (10, date(2024, 3, 15), 3),   # end_date ends the rule first
+    (3, date(2024, 3, 1), 3),     # both end on the same occurrence
+])
+def test_count_and_end_date_take_the_earlier_limit(count, end_date, expected):
+    rule = make_rule(RecurrenceFrequency.MONTHLY, date(2024, 1, 1), count=count, end_date=end_date)
+    occurrences = list(recurrence.iter_occurrences(rule, date(2020, 1, 1), date(2030, 1, 1)))
+    assert occurrences == brute_force_dates(rule)
+    assert len(occurrences) == expected
+    assert recurrence.last_index(rule) == expected - 1
+
+
+def test_rule_without_limits_never_ends():
+    rule = make_rule(RecurrenceFrequency.WEEKLY, date(2024, 1, 1))
+    assert recurrence.last_index(rule) is None
+
+
+@pytest.mark.parametrize("frequency", list(RecurrenceFrequency))
+def test_range_ending_on_date_max(frequency):
+    rule = make_rule(frequency, date(9999, 12, 31) - timedelta(days=400))
+    start = date(9999, 1, 1)
+    occurrences = list(recurrence.iter_occurrences(rule, start, date.max))
+    assert occurrences == [day for day in brute_force_dates(rule) if day >= start]
+    assert recurrence.count_occurrences(rule, start, date.max) == len(occurrences)
+    totals = recurrence.monthly_totals([rule], start, date.max)
+    assert sum(totals.values()) == pytest.approx(rule.amount * len(occurrences))
+
+
+def test_rule_starting_on_date_max():
+    rule = make_rule(RecurrenceFrequency.DAILY, date.max)
+    assert list(recurrence.iter_occurrences(rule, date(9999, 12, 1), date.max)) == [date.max]
+    assert recurrence.first_index_after(rule, date.max) == 1
+
+
+def test_count_skips_materialized_occurrences():
+    rule = make_rule(RecurrenceFrequency.DAILY, date(2024, 1, 1), materialized_through=date(2024, 1, 10))
+    assert recurrence.count_occurrences(rule, date(2024, 1, 1), date(2024, 1, 31)) == 21
+    assert recurrence.count_occurrences(rule, date(2024, 1, 11), date(2024, 1, 31)) == 21
+    assert recurrence.count_occurrences(rule, date(2024, 1, 1), date(2024, 1, 10)) == 0
+
+
+def test_random_rules_match_brute_force():
+    rng = random.Random(42)
+    for trial in range(2000):
+        near_max = trial % 2 == 1
+        if near_max:
+            start_date = date.max - timedelta(days=rng.randint(0, 900))
+            range_start = start_date - timedelta(days=rng.randint(0, 100))
+            range_end = date.max
+        else:
+            start_date = date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500))
+            range_start = start_date + timedelta(days=rng.randint(-100, 400))
+            range_end = range_start + timedelta(days=rng.randint(0, 800))
+        rule = random_rule(rng, start_date)
+
+        expected = [day for day in brute_force_dates(rule, range_end) if day >= range_start]
+        assert list(recurrence.iter_occurrences(rule, range_start, range_end)) == expected, rule
+        assert recurrence.count_occurrences(rule, range_start, range_end) == len(expected)
+
+        totals = {}
+        for day in expected:
+            month = day.strftime("%Y-%m")
+            totals[month] = totals.get(month, 0.0) + rule.amount
+        assert recurrence.monthly_totals([rule], range_start, range_end) == pytest.approx(totals)